@@ -1,11 +1,16 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
+from configurationuser.api.responses import ORJSONResponse, dumps
+from configurationuser.config import settings
 from configurationuser.exceptions import (
     AgeGroupConflictError,
     AgeGroupInternalError,
     AgeGroupNotFoundError,
+    AgeGroupReplaceTooLargeError,
+    InvalidCursorError,
 )
 from configurationuser.schemas.age_group_schema import AgeGroupIn, AgeGroupOut
 from configurationuser.security import verify_credentials
@@ -14,6 +19,17 @@ from configurationuser.services.age_group import AgeGroupService
 router = APIRouter(dependencies=[Depends(verify_credentials)])
 
 
+def version_etag(version: int) -> str:
+    return f'"v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
+
 @router.post(
     '',
     response_model=AgeGroupOut,
@@ -26,7 +42,9 @@ def create_age_group(
     service: AgeGroupService = Depends(),
 ):
     try:
-        return service.create_age_group(age_group)
+        return ORJSONResponse(
+            status_code=status.HTTP_201_CREATED, content=service.create_age_group(age_group)
+        )
     except AgeGroupConflictError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -39,6 +57,42 @@ def create_age_group(
         )
 
 
+@router.put(
+    '',
+    response_model=List[AgeGroupOut],
+    status_code=status.HTTP_200_OK,
+    summary='Replace all age groups',
+    description=(
+        'Atomically replaces the whole configuration with the given set of ranges. Ranges '
+        'that already exist keep their id; the rest is created or deleted in one transaction.'
+    ),
+)
+def replace_age_groups(
+    age_groups: List[AgeGroupIn],
+    service: AgeGroupService = Depends(),
+):
+    try:
+        return ORJSONResponse(content=service.replace_age_groups(age_groups))
+    except AgeGroupConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Age groups overlap each other',
+        )
+    except AgeGroupReplaceTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f'At most {settings.AGE_GROUP_REPLACE_MAX_CHANGES} groups can be created '
+                'or deleted per replacement'
+            ),
+        )
+    except AgeGroupInternalError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail='Internal server',
+        )
+
+
 @router.delete(
     '/{id}',
     status_code=status.HTTP_204_NO_CONTENT,
@@ -68,15 +122,59 @@ def delete_age_group(
     response_model=List[AgeGroupOut],
     status_code=status.HTTP_200_OK,
     summary='List all age groups',
-    description='Retrieves a list of all registered age groups.',
+    description=(
+        'Retrieves all registered age groups. With `limit` or `cursor` a single page is '
+        'returned and the next cursor is sent in the `X-Next-Cursor` header; with '
+        '`format=ndjson` every group is streamed, optionally scanning `segments` in parallel. '
+        'Responses carry an `ETag` derived from the configuration version; a matching '
+        '`If-None-Match` gets `304 Not Modified` without reading the age groups table.'
+    ),
 )
-def get_age_groups(
+def get_age_groups(  # noqa: PLR0913, PLR0917
+    limit: Optional[int] = Query(default=None, ge=1, le=settings.AGE_GROUPS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
+    fmt: str = Query(default='json', alias='format', pattern='^(json|ndjson)$'),
+    segments: int = Query(default=1, ge=1, le=settings.AGE_GROUPS_MAX_SCAN_SEGMENTS),
+    if_none_match: Optional[str] = Header(default=None, alias='If-None-Match'),
     service: AgeGroupService = Depends(),
 ):
     try:
-        return service.get_age_groups()
+        etag = version_etag(service.get_version())
+    except AgeGroupInternalError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail='Internal server',
+        )
+
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if fmt == 'ndjson':
+        return StreamingResponse(
+            (dumps(age_group) + b'\n' for age_group in service.iter_age_groups(segments)),
+            media_type='application/x-ndjson',
+            headers=headers,
+        )
+
+    try:
+        if limit is None and cursor is None:
+            return ORJSONResponse(content=service.get_age_groups(), headers=headers)
+
+        items, next_cursor = service.get_age_groups_page(
+            limit or settings.AGE_GROUPS_PAGE_SIZE, cursor
+        )
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor',
+        )
     except AgeGroupInternalError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail='Internal server',
         )
+
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    return ORJSONResponse(content=items, headers=headers)
@@ -0,0 +1,95 @@
+import threading
+
+import boto3
+from botocore.config import Config
+
+from configurationuser.config import settings
+
+
+class AWSClients:
+    """Process-wide registry of pooled boto3 clients.
+
+    Low-level clients are built once and shared by every request: botocore
+    clients are thread-safe and keep their connection pool (and TLS sessions)
+    alive between calls. boto3 resources are not thread-safe, so each thread gets
+    its own lightweight DynamoDB resource and Table objects, all wrapping the one
+    shared low-level client; they are dropped together with their thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._dynamodb = None
+        self._generation = 0
+        self._sqs = None
+        self._queue_urls = {}
+
+    @staticmethod
+    def _client_kwargs() -> dict:
+        return {
+            'endpoint_url': settings.AWS_ENDPOINT_URL,
+            'region_name': settings.AWS_DEFAULT_REGION,
+            'aws_access_key_id': settings.AWS_ACCESS_KEY_ID,
+            'aws_secret_access_key': settings.AWS_SECRET_ACCESS_KEY,
+            'config': Config(
+                max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+                connect_timeout=settings.AWS_CONNECT_TIMEOUT,
+                read_timeout=settings.AWS_READ_TIMEOUT,
+                tcp_keepalive=settings.AWS_TCP_KEEPALIVE,
+                retries={'max_attempts': settings.AWS_MAX_ATTEMPTS, 'mode': 'standard'},
+            ),
+        }
+
+    @property
+    def dynamodb(self):
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            with self._lock:
+                if self._dynamodb is None:
+                    self._dynamodb = boto3.resource('dynamodb', **self._client_kwargs())
+                shared = self._dynamodb
+            local.dynamodb = type(shared)(client=shared.meta.client)
+            local.tables = {}
+            local.generation = self._generation
+        return local.dynamodb
+
+    @property
+    def sqs(self):
+        if self._sqs is None:
+            with self._lock:
+                if self._sqs is None:
+                    self._sqs = boto3.client('sqs', **self._client_kwargs())
+        return self._sqs
+
+    def queue_url(self, name: str) -> str:
+        url = self._queue_urls.get(name)
+        if url is None:
+            url = self.sqs.get_queue_url(QueueName=name)['QueueUrl']
+            self._queue_urls[name] = url
+        return url
+
+    def table(self, name: str):
+        dynamodb = self.dynamodb
+        tables = self._local.tables
+        table = tables.get(name)
+        if table is None:
+            table = tables[name] = dynamodb.Table(name)
+        return table
+
+    def open(self) -> 'AWSClients':
+        self.dynamodb
+        return self
+
+    def close(self):
+        with self._lock:
+            if self._dynamodb is not None:
+                self._dynamodb.meta.client.close()
+            if self._sqs is not None:
+                self._sqs.close()
+            self._dynamodb = None
+            self._generation += 1
+            self._sqs = None
+            self._queue_urls = {}
+
+
+aws_clients = AWSClients()
@@ -0,0 +1,78 @@
+import bisect
+import threading
+from typing import Collection, Dict, List, Optional
+
+
+class AgeGroupIntervalIndex:
+    """In-memory, version-stamped view of the (non-overlapping) age groups.
+
+    Groups are kept sorted by ``min_age``, so an overlap check is one binary
+    search: only the last group starting at or before the new ``max_age`` can
+    overlap it. ``version`` is the configuration version the snapshot was built
+    from; writers apply their own changes in place when the versions line up,
+    and everyone else reloads when the stored version moves ahead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._starts: List[int] = []
+        self._groups: List[Dict] = []
+        self.version: Optional[int] = None
+
+    def replace(self, groups: List[Dict], version: int):
+        with self._lock:
+            self._install(groups, version)
+
+    def overlaps(self, min_age: int, max_age: int) -> bool:
+        with self._lock:
+            position = bisect.bisect_right(self._starts, max_age) - 1
+            return position >= 0 and int(self._groups[position]['max_age']) >= min_age
+
+    def add(self, group: Dict, version: int):
+        """Record a group written at ``version``; drops the snapshot if it skipped a version."""
+        with self._lock:
+            if self.version != version - 1:
+                self.version = None
+                return
+
+            position = bisect.bisect_right(self._starts, int(group['min_age']))
+            self._starts.insert(position, int(group['min_age']))
+            self._groups.insert(position, group)
+            self.version = version
+
+    def remove(self, id: str, version: int):
+        """Forget a group deleted at ``version``; drops the snapshot if it skipped a version."""
+        with self._lock:
+            if self.version != version - 1:
+                self.version = None
+                return
+
+            for position, group in enumerate(self._groups):
+                if group['id'] == id:
+                    del self._starts[position]
+                    del self._groups[position]
+                    break
+            self.version = version
+
+    def swap(self, created: List[Dict], deleted_ids: Collection[str], version: int):
+        """Apply a bulk replace written at ``version``; drops the snapshot if it skipped one."""
+        with self._lock:
+            if self.version != version - 1:
+                self.version = None
+                return
+
+            kept = [group for group in self._groups if group['id'] not in deleted_ids]
+            self._install(kept + created, version)
+
+    def groups(self) -> List[Dict]:
+        with self._lock:
+            return list(self._groups)
+
+    def _install(self, groups: List[Dict], version: int):
+        groups = sorted(
+            (group for group in groups if 'min_age' in group and 'max_age' in group),
+            key=lambda group: int(group['min_age']),
+        )
+        self._groups = groups
+        self._starts = [int(group['min_age']) for group in groups]
+        self.version = version
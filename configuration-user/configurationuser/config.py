@@ -12,7 +12,19 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str
     AWS_DEFAULT_REGION: str
     AWS_ENDPOINT_URL: str
+    AWS_MAX_POOL_CONNECTIONS: int = 100
+    AWS_CONNECT_TIMEOUT: float = 2.0
+    AWS_READ_TIMEOUT: float = 5.0
+    AWS_TCP_KEEPALIVE: bool = True
+    AWS_MAX_ATTEMPTS: int = 3
     AGE_GROUPS_TABLE: str
+    AGE_GROUPS_CONFIG_TABLE: str = 'AgeGroupsConfig'
+    AGE_GROUP_WRITE_MAX_RETRIES: int = 5
+    AGE_GROUP_REPLACE_MAX_CHANGES: int = 99
+    AGE_GROUPS_PAGE_SIZE: int = 100
+    AGE_GROUPS_MAX_PAGE_SIZE: int = 1000
+    AGE_GROUPS_MAX_SCAN_SEGMENTS: int = 16
+    AGE_GROUP_EVENTS_QUEUES: str = ''
     QUEUE_NAME: str
 
 
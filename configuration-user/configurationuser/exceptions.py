@@ -12,3 +12,15 @@ class InvalidAgeRangeError(Exception):
 
 class AgeGroupInternalError(Exception):
     pass
+
+
+class AgeGroupConcurrentUpdateError(Exception):
+    pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class AgeGroupReplaceTooLargeError(Exception):
+    pass
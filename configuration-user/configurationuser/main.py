@@ -1,7 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from configurationuser.api import age_group_router
+from configurationuser.api.responses import ORJSONResponse
+from configurationuser.aws.clients import aws_clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.aws_clients = aws_clients.open()
+    yield
+    aws_clients.close()
+
 
-app = FastAPI(title='Configuration User', version='0.1.0')
+app = FastAPI(
+    title='Configuration User',
+    version='0.1.0',
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.include_router(age_group_router, prefix='/api/v1/age-groups', tags=['Age Groups'])
@@ -1,48 +1,252 @@
-from typing import Dict, List
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from boto3.dynamodb.conditions import Attr  # Para filtros eficientes
 from botocore.exceptions import ClientError
 
-from configurationuser.aws.dynamodb import get_age_groups_table
+from configurationuser.aws.dynamodb import get_age_groups_config_table, get_age_groups_table
+from configurationuser.cache.age_group_index import AgeGroupIntervalIndex
+from configurationuser.exceptions import AgeGroupConcurrentUpdateError
 from configurationuser.logger import get_logger
 
 logger = get_logger()
 
+CONFIG_KEY = {'id': 'age_groups'}
+
+age_group_index = AgeGroupIntervalIndex()
+
 
 class AgeGroupRepository:
+    """Age groups plus the configuration version that serializes every change.
+
+    Creates and deletes are transactions that also move the version item from
+    the value the caller checked against to the next one, so two writers racing
+    on a stale view cannot both succeed. Bulk replaces apply their whole diff in
+    the same kind of transaction. Every write returns the version it produced.
+    """
+
     def __init__(self):
-        self.table = get_age_groups_table()
+        self.checked_version: Optional[int] = None
 
-    def create(self, id: str, min_age: int, max_age: int):
-        item = {'id': id, 'min_age': min_age, 'max_age': max_age}
+    @property
+    def table(self):
+        return get_age_groups_table()
+
+    @property
+    def config_table(self):
+        return get_age_groups_config_table()
+
+    def get_version(self) -> int:
         try:
-            self.table.put_item(Item=item)
+            response = self.config_table.get_item(Key=CONFIG_KEY, ConsistentRead=True)
         except ClientError as e:
-            logger.error(f'Error creating age group: {e} | error: repository')
-            raise RuntimeError('Failed to create age group')
+            logger.error(f'Error reading age group version: {e} | error: repository')
+            raise RuntimeError('Failed to read age group version')
+
+        return int(response.get('Item', {}).get('version', 0))
 
-    def delete(self, id: str) -> bool:
+    def create(self, id: str, min_age: int, max_age: int) -> int:
+        item = {'id': id, 'min_age': min_age, 'max_age': max_age}
+        version = self._expected_version()
+        self._transact([self._put(item)], version, 'create age group')
+        age_group_index.add(item, version + 1)
+        return version + 1
+
+    def delete(self, id: str) -> Optional[int]:
+        version = self._expected_version()
         try:
-            response = self.table.delete_item(Key={'id': id}, ReturnValues='ALL_OLD')
-            return 'Attributes' in response
-        except ClientError as e:
-            logger.error(f'Error deleting age group: {e} | error: repository')
-            raise RuntimeError('Failed to delete age group')
+            self._transact([self._delete(id)], version, 'delete age group')
+        except LookupError:
+            return None
+
+        age_group_index.remove(id, version + 1)
+        return version + 1
+
+    def replace(self, created: List[Dict], deleted_ids: List[str], version: int) -> int:
+        """Write ``created`` and delete ``deleted_ids`` as one change on top of ``version``."""
+        writes = [self._delete(id) for id in deleted_ids] + [self._put(item) for item in created]
+        try:
+            self._transact(writes, version, 'replace age groups')
+        except LookupError:
+            raise AgeGroupConcurrentUpdateError()
+
+        age_group_index.swap(created, set(deleted_ids), version + 1)
+        return version + 1
+
+    def snapshot(self) -> Tuple[List[Dict], int]:
+        """Current groups together with the configuration version they belong to."""
+        version = self._sync_index()
+        return age_group_index.groups(), version
 
     def get_all(self) -> List[Dict]:
+        return [item for page in self.iter_pages(consistent=True) for item in page]
+
+    def get_page(
+        self, limit: int, start_key: Optional[Dict] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        kwargs = {'Limit': limit, 'ConsistentRead': True}
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+
         try:
-            response = self.table.scan()
-            return response.get('Items', [])
+            response = self.table.scan(**kwargs)
         except ClientError as e:
             logger.error(f'Error retrieving age groups: {e} | error: repository')
-            return []
+            raise RuntimeError('Failed to retrieve age groups')
+
+        return response.get('Items', []), response.get('LastEvaluatedKey')
+
+    def iter_pages(
+        self,
+        segment: Optional[int] = None,
+        total_segments: Optional[int] = None,
+        consistent: bool = False,
+    ) -> Iterator[List[Dict]]:
+        """Follow ``LastEvaluatedKey`` lazily, one scan page at a time."""
+        kwargs = {'ConsistentRead': consistent}
+        if total_segments:
+            kwargs.update(Segment=segment, TotalSegments=total_segments)
+
+        while True:
+            try:
+                response = self.table.scan(**kwargs)
+            except ClientError as e:
+                logger.error(f'Error retrieving age groups: {e} | error: repository')
+                raise RuntimeError('Failed to retrieve age groups')
+
+            yield response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                return
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def iter_parallel(self, total_segments: int) -> Iterator[Dict]:
+        """Scan ``total_segments`` segments concurrently and yield items as pages arrive.
+
+        A bounded queue between the scanning threads and the consumer keeps at most
+        a few pages in memory.
+        """
+        pages: queue.Queue = queue.Queue(maxsize=total_segments * 2)
+        done = object()
+        stopping = threading.Event()
+
+        def offer(value) -> bool:
+            while not stopping.is_set():
+                try:
+                    pages.put(value, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def scan_segment(segment: int):
+            try:
+                for page in self.iter_pages(segment, total_segments, consistent=True):
+                    if not offer(page):
+                        return
+            except RuntimeError as e:
+                offer(e)
+            except Exception as e:
+                logger.error(f'Error scanning age group segment {segment}: {e} | error: repository')
+                offer(RuntimeError('Failed to retrieve age groups'))
+            finally:
+                offer(done)
+
+        threads = [
+            threading.Thread(target=scan_segment, args=(segment,), daemon=True)
+            for segment in range(total_segments)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            remaining = total_segments
+            while remaining:
+                page = pages.get()
+                if page is done:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            stopping.set()
 
     def check_conflict(self, min_age: int, max_age: int) -> bool:
+        self.checked_version = self._sync_index()
+        return age_group_index.overlaps(min_age, max_age)
+
+    def _sync_index(self) -> int:
         try:
-            response = self.table.scan(
-                FilterExpression=Attr('min_age').lte(max_age) & Attr('max_age').gte(min_age)
-            )
-            return len(response.get('Items', [])) > 0
+            version = self.get_version()
+            if age_group_index.version != version:
+                age_group_index.replace(
+                    [item for page in self.iter_pages(consistent=True) for item in page], version
+                )
         except ClientError as e:
             logger.error(f'Error checking conflict: {e} | error: repository')
             raise RuntimeError('Failed to check age group conflict')
+
+        return version
+
+    def _expected_version(self) -> int:
+        version, self.checked_version = self.checked_version, None
+        return self.get_version() if version is None else version
+
+    def _put(self, item: Dict) -> Dict:
+        return {
+            'Put': {
+                'TableName': self.table.name,
+                'Item': item,
+                'ConditionExpression': 'attribute_not_exists(id)',
+            }
+        }
+
+    def _delete(self, id: str) -> Dict:
+        return {
+            'Delete': {
+                'TableName': self.table.name,
+                'Key': {'id': id},
+                'ConditionExpression': 'attribute_exists(id)',
+            }
+        }
+
+    def _version_bump(self, version: int) -> Dict:
+        condition = '#version = :expected'
+        if version == 0:
+            condition = f'attribute_not_exists(#version) OR {condition}'
+
+        return {
+            'Update': {
+                'TableName': self.config_table.name,
+                'Key': CONFIG_KEY,
+                'UpdateExpression': 'SET #version = :next',
+                'ConditionExpression': condition,
+                'ExpressionAttributeNames': {'#version': 'version'},
+                'ExpressionAttributeValues': {':expected': version, ':next': version + 1},
+            }
+        }
+
+    def _transact(self, writes: List[Dict], version: int, action: str):
+        """Run ``writes`` together with the version bump.
+
+        Raises ``LookupError`` when one of the writes' own conditions fails and
+        ``AgeGroupConcurrentUpdateError`` when the version moved in the meantime.
+        """
+        try:
+            self.table.meta.client.transact_write_items(
+                TransactItems=[*writes, self._version_bump(version)]
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                logger.error(f'Error trying to {action}: {e} | error: repository')
+                raise RuntimeError(f'Failed to {action}')
+
+            reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+            if len(reasons) > len(writes) and reasons[-1] == 'ConditionalCheckFailed':
+                logger.warning(f'Age group version {version} is stale | error: repository')
+                raise AgeGroupConcurrentUpdateError()
+            if 'ConditionalCheckFailed' in reasons[: len(writes)]:
+                raise LookupError(action)
+
+            logger.error(f'Error trying to {action}: {e} | error: repository')
+            raise RuntimeError(f'Failed to {action}')
@@ -1,13 +1,23 @@
+import base64
+import binascii
+import itertools
+import json
 import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from configurationuser.config import settings
 from configurationuser.exceptions import (
+    AgeGroupConcurrentUpdateError,
     AgeGroupConflictError,
     AgeGroupInternalError,
     AgeGroupNotFoundError,
+    AgeGroupReplaceTooLargeError,
+    InvalidCursorError,
 )
 from configurationuser.logger import get_logger
 from configurationuser.repositories.age_group import AgeGroupRepository
 from configurationuser.schemas.age_group_schema import AgeGroupIn, AgeGroupOut
+from configurationuser.services.age_group_events import age_group_events
 
 logger = get_logger()
 
@@ -17,26 +27,116 @@ class AgeGroupService:
         self.repository = AgeGroupRepository()
 
     def create_age_group(self, age_group: AgeGroupIn) -> AgeGroupOut:
-        if self.repository.check_conflict(age_group.min_age, age_group.max_age):
-            logger.error(f'Age group conflict detected: {age_group} | error: services')
-            raise AgeGroupConflictError()
+        """Check for overlaps and write the group atomically against the same version.
 
+        If another change lands in between, the write is rejected and the check is
+        repeated against the new version, up to AGE_GROUP_WRITE_MAX_RETRIES times.
+        """
         age_group_id = str(uuid.uuid4())
-        try:
-            self.repository.create(age_group_id, age_group.min_age, age_group.max_age)
-        except Exception as e:
-            logger.error(f'Error creating age group in DynamoDB: {e} | error: services')
+        for _ in range(settings.AGE_GROUP_WRITE_MAX_RETRIES):
+            if self.repository.check_conflict(age_group.min_age, age_group.max_age):
+                logger.error(f'Age group conflict detected: {age_group} | error: services')
+                raise AgeGroupConflictError()
+
+            try:
+                version = self.repository.create(age_group_id, age_group.min_age, age_group.max_age)
+                break
+            except AgeGroupConcurrentUpdateError:
+                continue
+            except Exception as e:
+                logger.error(f'Error creating age group in DynamoDB: {e} | error: services')
+                raise AgeGroupInternalError()
+        else:
+            logger.error('Gave up creating age group after concurrent updates | error: services')
             raise AgeGroupInternalError()
 
-        return AgeGroupOut(id=age_group_id, min_age=age_group.min_age, max_age=age_group.max_age)
+        created = AgeGroupOut(id=age_group_id, min_age=age_group.min_age, max_age=age_group.max_age)
+        age_group_events.created(created.model_dump(), version)
+        return created
 
     def delete_age_group(self, id: str) -> bool:
-        response = self.repository.delete(id)
-        if not response:
+        for _ in range(settings.AGE_GROUP_WRITE_MAX_RETRIES):
+            try:
+                version = self.repository.delete(id)
+                break
+            except AgeGroupConcurrentUpdateError:
+                continue
+        else:
+            logger.error(
+                f'Gave up deleting age group {id} after concurrent updates | error: services'
+            )
+            raise AgeGroupInternalError()
+
+        if not version:
             logger.warning(f'Age group not found for deletion: {id} | error: services')
             raise AgeGroupNotFoundError()
 
-        return response
+        age_group_events.deleted(id, version)
+        return True
+
+    def replace_age_groups(self, age_groups: List[AgeGroupIn]) -> List[AgeGroupOut]:
+        """Make ``age_groups`` the complete configuration in a single transaction.
+
+        The new set is checked for overlaps with one sort, then diffed by range
+        against the current groups: unchanged ranges keep their id, and only the
+        added and removed ones are written, together with the version bump.
+        """
+        ranges = sorted((age_group.min_age, age_group.max_age) for age_group in age_groups)
+        for (_, previous_max), (next_min, _) in itertools.pairwise(ranges):
+            if next_min <= previous_max:
+                logger.error('Overlapping age groups in replacement set | error: services')
+                raise AgeGroupConflictError()
+
+        for _ in range(settings.AGE_GROUP_WRITE_MAX_RETRIES):
+            try:
+                current, version = self.repository.snapshot()
+            except Exception as e:
+                logger.error(f'Error reading age groups to replace: {e} | error: services')
+                raise AgeGroupInternalError()
+
+            existing = {(int(group['min_age']), int(group['max_age'])): group for group in current}
+            kept = [existing[age_range] for age_range in ranges if age_range in existing]
+            created = [
+                {'id': str(uuid.uuid4()), 'min_age': min_age, 'max_age': max_age}
+                for min_age, max_age in ranges
+                if (min_age, max_age) not in existing
+            ]
+            kept_ids = {group['id'] for group in kept}
+            deleted_ids = [group['id'] for group in current if group['id'] not in kept_ids]
+            if not created and not deleted_ids:
+                return [AgeGroupOut.model_validate(group) for group in kept]
+
+            if len(created) + len(deleted_ids) > settings.AGE_GROUP_REPLACE_MAX_CHANGES:
+                logger.error(
+                    f'Age group replacement needs {len(created) + len(deleted_ids)} changes '
+                    f'| error: services'
+                )
+                raise AgeGroupReplaceTooLargeError()
+
+            try:
+                version = self.repository.replace(created, deleted_ids, version)
+                break
+            except AgeGroupConcurrentUpdateError:
+                continue
+            except Exception as e:
+                logger.error(f'Error replacing age groups in DynamoDB: {e} | error: services')
+                raise AgeGroupInternalError()
+        else:
+            logger.error('Gave up replacing age groups after concurrent updates | error: services')
+            raise AgeGroupInternalError()
+
+        age_group_events.replaced(version)
+        return [
+            AgeGroupOut.model_validate(group)
+            for group in sorted(kept + created, key=lambda group: int(group['min_age']))
+        ]
+
+    def get_version(self) -> int:
+        try:
+            return self.repository.get_version()
+        except Exception as e:
+            logger.error(f'Error reading age group version: {e} | error: services')
+            raise AgeGroupInternalError()
 
     def get_age_groups(self) -> list[dict]:
         try:
@@ -48,3 +148,36 @@ class AgeGroupService:
                 f'| error: services'
             )
             raise AgeGroupInternalError()
+
+    def get_age_groups_page(
+        self, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        start_key = self.decode_cursor(cursor) if cursor else None
+        try:
+            items, last_key = self.repository.get_page(limit, start_key)
+        except Exception as e:
+            logger.error(f'Error retrieving age group page from DynamoDB: {e} | error: services')
+            raise AgeGroupInternalError()
+
+        return items, self.encode_cursor(last_key) if last_key else None
+
+    def iter_age_groups(self, segments: int = 1) -> Iterator[Dict]:
+        """Yield every age group lazily, scanning ``segments`` segments in parallel."""
+        if segments > 1:
+            return self.repository.iter_parallel(segments)
+        return (item for page in self.repository.iter_pages(consistent=True) for item in page)
+
+    @staticmethod
+    def encode_cursor(last_key: Dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(last_key).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Dict:
+        try:
+            start_key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValueError):
+            raise InvalidCursorError()
+
+        if not isinstance(start_key, dict) or not isinstance(start_key.get('id'), str):
+            raise InvalidCursorError()
+        return start_key
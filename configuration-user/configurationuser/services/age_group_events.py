@@ -0,0 +1,59 @@
+import json
+from typing import Dict, List, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from configurationuser.aws.clients import aws_clients
+from configurationuser.config import settings
+from configurationuser.logger import get_logger
+
+logger = get_logger()
+
+
+class AgeGroupEventPublisher:
+    """Sends every committed age group change to the downstream event queues.
+
+    Each event carries the configuration version the change produced, so a
+    subscriber can apply consecutive events incrementally and reload the whole
+    table when it sees a gap. Publishing is best effort: the change is already
+    committed, and a lost event shows up as a gap on the next one.
+    """
+
+    def __init__(self, queue_names: List[str]):
+        self.queue_names = queue_names
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.queue_names)
+
+    def created(self, group: Dict, version: int):
+        self.publish({'op': 'created', 'version': version, 'group': group})
+
+    def deleted(self, id: str, version: int):
+        self.publish({'op': 'deleted', 'version': version, 'id': id})
+
+    def replaced(self, version: int):
+        self.publish({'op': 'replaced', 'version': version})
+
+    def publish(self, event: Dict):
+        if not self.enabled:
+            return
+
+        body = json.dumps(event)
+        for queue_name in self.queue_names:
+            try:
+                aws_clients.sqs.send_message(
+                    QueueUrl=aws_clients.queue_url(queue_name), MessageBody=body
+                )
+            except (BotoCoreError, ClientError) as e:
+                logger.error(
+                    f'Error publishing age group event {event["op"]} v{event["version"]} '
+                    f'to {queue_name}: {e} | error: services'
+                )
+
+
+def parse_queue_names(value: Optional[str]) -> List[str]:
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+age_group_events = AgeGroupEventPublisher(parse_queue_names(settings.AGE_GROUP_EVENTS_QUEUES))
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -22,3 +24,12 @@ def age_group_data():
         'min_age': 10,
         'max_age': 20,
     }
+
+
+@pytest.fixture
+def config_version():
+    with patch(
+        'configurationuser.repositories.age_group.AgeGroupRepository.get_version',
+        return_value=7,
+    ) as mock_get_version:
+        yield mock_get_version
@@ -1,7 +1,15 @@
+import json
 import uuid
+from decimal import Decimal
 from http import HTTPStatus
 from unittest.mock import patch
 
+import pytest
+from botocore.exceptions import EndpointConnectionError
+
+from configurationuser.repositories.age_group import AgeGroupRepository
+from configurationuser.services.age_group_events import age_group_events
+
 
 @patch('configurationuser.repositories.age_group.AgeGroupRepository.check_conflict')
 @patch('configurationuser.repositories.age_group.AgeGroupRepository.create')
@@ -48,6 +56,7 @@ def test_get_all_age_groups(
     mock_get_all,
     client,
     age_group_data,
+    config_version,
 ):
     mock_get_all.return_value = [age_group_data]
 
@@ -58,13 +67,62 @@ def test_get_all_age_groups(
     assert response.json()[0]['id'] == age_group_data['id']
 
 
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.get_all')
+def test_get_all_age_groups_serializes_dynamodb_decimals(
+    mock_get_all,
+    client,
+    age_group_data,
+    config_version,
+):
+    mock_get_all.return_value = [
+        {**age_group_data, 'min_age': Decimal('10'), 'max_age': Decimal('20')}
+    ]
+
+    response = client.get('/api/v1/age-groups')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == [age_group_data]
+
+
+@patch('configurationuser.services.age_group_events.aws_clients')
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.delete')
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.check_conflict')
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.create')
+def test_changes_are_published_with_their_version(
+    mock_create,
+    mock_check_conflict,
+    mock_delete,
+    mock_aws_clients,
+    client,
+):
+    mock_check_conflict.return_value = False
+    mock_create.return_value = 4
+    mock_delete.return_value = 5
+    mock_aws_clients.queue_url.side_effect = lambda name: f'http://sqs/{name}'
+
+    with patch.object(age_group_events, 'queue_names', ['events-a', 'events-b']):
+        created = client.post('/api/v1/age-groups', json={'min_age': 10, 'max_age': 20}).json()
+        client.delete(f'/api/v1/age-groups/{created["id"]}')
+
+    sent = [
+        (call.kwargs['QueueUrl'], json.loads(call.kwargs['MessageBody']))
+        for call in mock_aws_clients.sqs.send_message.call_args_list
+    ]
+    assert sent == [
+        ('http://sqs/events-a', {'op': 'created', 'version': 4, 'group': created}),
+        ('http://sqs/events-b', {'op': 'created', 'version': 4, 'group': created}),
+        ('http://sqs/events-a', {'op': 'deleted', 'version': 5, 'id': created['id']}),
+        ('http://sqs/events-b', {'op': 'deleted', 'version': 5, 'id': created['id']}),
+    ]
+
+
 @patch('configurationuser.repositories.age_group.AgeGroupRepository.delete')
 def test_delete_age_group_success(
     mock_delete,
     client,
     age_group_data,
 ):
-    mock_delete.return_value = True
+    mock_delete.return_value = 1
 
     response = client.delete(f'/api/v1/age-groups/{age_group_data["id"]}')
 
@@ -76,9 +134,127 @@ def test_delete_age_group_not_found(
     mock_delete,
     client,
 ):
-    mock_delete.return_value = False
+    mock_delete.return_value = None
 
     response = client.delete(f'/api/v1/age-groups/{uuid.uuid4()}')
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json()['detail'] == 'Age group not found'
+
+
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.get_all')
+def test_get_age_groups_etag_follows_config_version(
+    mock_get_all,
+    client,
+    age_group_data,
+    config_version,
+):
+    mock_get_all.return_value = [age_group_data]
+
+    response = client.get('/api/v1/age-groups')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] == '"v7"'
+
+    response = client.get('/api/v1/age-groups', headers={'If-None-Match': '"v7"'})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == '"v7"'
+    mock_get_all.assert_called_once()
+
+    mock_get_all.reset_mock()
+    config_version.return_value = 8
+    response = client.get('/api/v1/age-groups', headers={'If-None-Match': 'W/"v7"'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] == '"v8"'
+    mock_get_all.assert_called_once()
+
+
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.get_page')
+def test_get_age_groups_page_with_cursor(
+    mock_get_page,
+    client,
+    age_group_data,
+    config_version,
+):
+    mock_get_page.return_value = ([age_group_data], {'id': age_group_data['id']})
+
+    response = client.get('/api/v1/age-groups', params={'limit': 1})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == [age_group_data]
+    next_cursor = response.headers['X-Next-Cursor']
+
+    mock_get_page.return_value = ([], None)
+    response = client.get('/api/v1/age-groups', params={'limit': 1, 'cursor': next_cursor})
+
+    assert mock_get_page.call_args.args == (1, {'id': age_group_data['id']})
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_get_age_groups_invalid_cursor(client, config_version):
+    response = client.get('/api/v1/age-groups', params={'cursor': 'not-a-cursor'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.iter_pages')
+def test_get_age_groups_ndjson_follows_pages(
+    mock_iter_pages,
+    client,
+    age_group_data,
+    config_version,
+):
+    second = {**age_group_data, 'id': 'second', 'min_age': Decimal(21), 'max_age': Decimal(30)}
+    mock_iter_pages.return_value = iter([[age_group_data], [second]])
+
+    response = client.get('/api/v1/age-groups', params={'format': 'ndjson'})
+
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [json.loads(line)['id'] for line in response.text.splitlines()] == [
+        age_group_data['id'],
+        'second',
+    ]
+    mock_iter_pages.assert_called_once_with(consistent=True)
+
+
+@patch('configurationuser.repositories.age_group.get_age_groups_config_table')
+@patch('configurationuser.repositories.age_group.get_age_groups_table')
+def test_parallel_scan_covers_every_segment(mock_table, mock_config_table):
+    def scan(Segment, TotalSegments, ConsistentRead, **kwargs):  # noqa: N803
+        assert ConsistentRead
+        return {'Items': [{'id': f'{Segment}/{TotalSegments}'}]}
+
+    mock_table.return_value.scan.side_effect = scan
+
+    items = list(AgeGroupRepository().iter_parallel(4))
+
+    assert sorted(item['id'] for item in items) == ['0/4', '1/4', '2/4', '3/4']
+
+
+@patch('configurationuser.repositories.age_group.get_age_groups_config_table')
+@patch('configurationuser.repositories.age_group.get_age_groups_table')
+def test_listing_reads_are_consistent(mock_table, mock_config_table):
+    mock_table.return_value.scan.return_value = {'Items': []}
+    repository = AgeGroupRepository()
+
+    repository.get_all()
+    repository.get_page(10)
+
+    for call in mock_table.return_value.scan.call_args_list:
+        assert call.kwargs['ConsistentRead'] is True
+
+
+@patch('configurationuser.repositories.age_group.get_age_groups_config_table')
+@patch('configurationuser.repositories.age_group.get_age_groups_table')
+def test_parallel_scan_raises_when_a_segment_fails(mock_table, mock_config_table):
+    def scan(Segment, **kwargs):  # noqa: N803
+        if Segment == 1:
+            raise EndpointConnectionError(endpoint_url='http://localhost:4566')
+        return {'Items': [{'id': str(Segment)}]}
+
+    mock_table.return_value.scan.side_effect = scan
+
+    with pytest.raises(RuntimeError):
+        list(AgeGroupRepository().iter_parallel(4))
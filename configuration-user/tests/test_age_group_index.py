@@ -0,0 +1,166 @@
+from decimal import Decimal
+from http import HTTPStatus
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from configurationuser.cache.age_group_index import AgeGroupIntervalIndex
+from configurationuser.config import settings
+from configurationuser.exceptions import AgeGroupConcurrentUpdateError
+from configurationuser.repositories.age_group import AgeGroupRepository, age_group_index
+from configurationuser.schemas.age_group_schema import AgeGroupIn
+from configurationuser.services.age_group import AgeGroupService
+
+
+@pytest.fixture
+def index():
+    index = AgeGroupIntervalIndex()
+    index.replace(
+        [
+            {'id': 'adults', 'min_age': Decimal(18), 'max_age': Decimal(59)},
+            {'id': 'children', 'min_age': Decimal(0), 'max_age': Decimal(11)},
+        ],
+        version=3,
+    )
+    return index
+
+
+@pytest.mark.parametrize(
+    ('min_age', 'max_age', 'expected'),
+    [(12, 17, False), (11, 17, True), (12, 18, True), (60, 110, False), (5, 70, True)],
+)
+def test_interval_index_overlaps(index, min_age, max_age, expected):
+    assert index.overlaps(min_age, max_age) is expected
+
+
+def test_interval_index_applies_only_consecutive_versions(index):
+    next_version = 4
+    index.add({'id': 'teens', 'min_age': 12, 'max_age': 17}, version=next_version)
+    assert index.overlaps(15, 15)
+    assert index.version == next_version
+
+    index.remove('teens', version=6)
+    assert index.version is None
+
+
+def cancelled(*codes):
+    return ClientError(
+        {
+            'Error': {'Code': 'TransactionCanceledException'},
+            'CancellationReasons': [{'Code': code} for code in codes],
+        },
+        'TransactWriteItems',
+    )
+
+
+@patch('configurationuser.repositories.age_group.get_age_groups_config_table')
+@patch('configurationuser.repositories.age_group.get_age_groups_table')
+def test_create_is_a_versioned_transaction(mock_table, mock_config_table):
+    table = mock_table.return_value
+    table.scan.return_value = {'Items': [{'id': 'a', 'min_age': 0, 'max_age': 10}]}
+    version = 7
+    mock_config_table.return_value.get_item.return_value = {'Item': {'version': Decimal(version)}}
+    repository = AgeGroupRepository()
+
+    assert repository.check_conflict(11, 20) is False
+    assert repository.create('b', 11, 20) == version + 1
+
+    transact_items = table.meta.client.transact_write_items.call_args.kwargs['TransactItems']
+    bump = transact_items[1]['Update']
+    assert bump['ExpressionAttributeValues'] == {':expected': version, ':next': version + 1}
+    assert age_group_index.version == version + 1
+    assert age_group_index.overlaps(15, 15)
+
+    table.meta.client.transact_write_items.side_effect = cancelled('None', 'ConditionalCheckFailed')
+    repository.checked_version = version + 1
+    with pytest.raises(AgeGroupConcurrentUpdateError):
+        repository.create('c', 30, 40)
+
+    table.meta.client.transact_write_items.side_effect = cancelled('ConditionalCheckFailed', 'None')
+    assert repository.delete('missing') is None
+
+
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.check_conflict')
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.create')
+def test_create_age_group_retries_after_concurrent_update(
+    mock_create,
+    mock_check_conflict,
+    client,
+):
+    mock_check_conflict.side_effect = [False, True]
+    mock_create.side_effect = [AgeGroupConcurrentUpdateError(), MagicMock()]
+
+    response = client.post('/api/v1/age-groups', json={'min_age': 10, 'max_age': 20})
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert mock_create.call_count == 1
+    mock_check_conflict.assert_called_with(10, 20)
+
+
+@patch('configurationuser.repositories.age_group.get_age_groups_config_table')
+@patch('configurationuser.repositories.age_group.get_age_groups_table')
+def test_replace_age_groups_applies_the_diff_in_one_transaction(
+    mock_table,
+    mock_config_table,
+    client,
+):
+    table = mock_table.return_value
+    table.scan.return_value = {
+        'Items': [
+            {'id': 'children', 'min_age': Decimal(0), 'max_age': Decimal(11)},
+            {'id': 'adults', 'min_age': Decimal(18), 'max_age': Decimal(59)},
+        ]
+    }
+    version = 12
+    mock_config_table.return_value.get_item.return_value = {'Item': {'version': Decimal(version)}}
+    age_group_index.version = None
+
+    response = client.put(
+        '/api/v1/age-groups',
+        json=[{'min_age': 18, 'max_age': 64}, {'min_age': 0, 'max_age': 11}],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    children, adults = response.json()
+    assert children['id'] == 'children'
+    assert (adults['min_age'], adults['max_age']) == (18, 64)
+
+    transact_items = table.meta.client.transact_write_items.call_args.kwargs['TransactItems']
+    assert transact_items[0]['Delete']['Key'] == {'id': 'adults'}
+    assert transact_items[1]['Put']['Item'] == adults
+    assert transact_items[2]['Update']['ExpressionAttributeValues'][':next'] == version + 1
+    assert age_group_index.version == version + 1
+    assert [group['id'] for group in age_group_index.groups()] == ['children', adults['id']]
+
+
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.snapshot')
+def test_replace_age_groups_rejects_overlaps_and_large_diffs(mock_snapshot, client):
+    response = client.put(
+        '/api/v1/age-groups',
+        json=[{'min_age': 0, 'max_age': 10}, {'min_age': 10, 'max_age': 20}],
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    mock_snapshot.assert_not_called()
+
+    mock_snapshot.return_value = ([], 1)
+    with patch.object(settings, 'AGE_GROUP_REPLACE_MAX_CHANGES', 1):
+        response = client.put(
+            '/api/v1/age-groups',
+            json=[{'min_age': 0, 'max_age': 10}, {'min_age': 11, 'max_age': 20}],
+        )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.replace')
+@patch('configurationuser.repositories.age_group.AgeGroupRepository.snapshot')
+def test_replace_age_groups_is_a_noop_when_nothing_changes(mock_snapshot, mock_replace):
+    current = [{'id': 'children', 'min_age': Decimal(0), 'max_age': Decimal(11)}]
+    mock_snapshot.return_value = (current, 3)
+
+    groups = AgeGroupService().replace_age_groups([AgeGroupIn(min_age=0, max_age=11)])
+
+    assert [group.id for group in groups] == ['children']
+    mock_replace.assert_not_called()
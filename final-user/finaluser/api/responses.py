@@ -0,0 +1,48 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+import pydantic_core
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.types import Receive, Scope, Send
+
+
+def orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    raise TypeError(f'Type is not JSON serializable: {type(value).__name__}')
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize pydantic models with pydantic-core and everything else with orjson."""
+    if isinstance(content, BaseModel):
+        return pydantic_core.to_json(content)
+    return orjson.dumps(content, default=orjson_default)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response that accepts pydantic models as content and renders them directly.
+
+    Avoids the ``model_dump`` + stdlib ``json`` round trip, and turns DynamoDB
+    ``Decimal`` values into ``int``/``float`` instead of failing.
+    """
+
+    def render(self, content: Any) -> bytes:  # noqa: PLR6301
+        return dumps(content)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """Streaming response for endpoints that keep reading the request body.
+
+    ``StreamingResponse`` listens on ``receive`` for a client disconnect while it
+    streams, which swallows the body chunks the endpoint is still consuming. This
+    variant only sends, and a disconnect surfaces as a failed send instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -1,9 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+from typing import List, Optional
 
-from finaluser.exceptions import EnrollmentNotFoundError, EnrollmentSQSError
-from finaluser.schemas.enrollment import EnrollmentIn, EnrollmentOut, EnrollmentResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from finaluser.api.responses import DuplexStreamingResponse, ORJSONResponse, dumps
+from finaluser.config import settings
+from finaluser.exceptions import (
+    EnrollmentNotFoundError,
+    EnrollmentSQSError,
+    IdempotencyKeyConflictError,
+)
+from finaluser.schemas.enrollment import (
+    EnrollmentBulkItem,
+    EnrollmentBulkResponse,
+    EnrollmentIn,
+    EnrollmentOut,
+    EnrollmentResponse,
+)
 from finaluser.services.enrollment import EnrollmentService
-from starlette.responses import JSONResponse
+from finaluser.services.enrollment_import import EnrollmentImportService, iter_lines
+from finaluser.services.idempotency import IdempotencyService
 
 router = APIRouter()
 
@@ -22,21 +39,48 @@ STATUS_RESPONSE = {
     }
 }
 
+
 @router.post('/', response_model=EnrollmentResponse)
-def create_enrollment(
+async def create_enrollment(
     enrollment: EnrollmentIn,
     service: EnrollmentService = Depends(),
+    idempotency: IdempotencyService = Depends(),
+    idempotency_key: Optional[str] = Header(default=None, alias='Idempotency-Key'),
 ):
+    fingerprint = None
+    if idempotency_key:
+        fingerprint = hashlib.sha256(enrollment.model_dump_json().encode()).hexdigest()
+        try:
+            stored = await idempotency.get_response_async(idempotency_key, fingerprint)
+        except IdempotencyKeyConflictError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail='Idempotency-Key already used for a different request',
+            )
+        if stored:
+            return ORJSONResponse(
+                status_code=stored['status_code'],
+                content=stored['content'],
+                headers={'Idempotent-Replayed': 'true'},
+            )
+
     try:
-        response = service.create_enrollment(enrollment)
+        response = await service.create_enrollment_async(enrollment)
         status_info = STATUS_RESPONSE[response.status]
         content = EnrollmentResponse(
             message=status_info["message"],
             data=response if response.status == "pending" else None
         )
-        return JSONResponse(
+        if idempotency_key:
+            await idempotency.save_response_async(
+                idempotency_key,
+                fingerprint,
+                status_info['status_code'],
+                content.model_dump(mode='json'),
+            )
+        return ORJSONResponse(
             status_code=status_info["status_code"],
-            content=content.model_dump()
+            content=content
         )
 
     except EnrollmentSQSError:
@@ -45,16 +89,96 @@ def create_enrollment(
         )
 
 
+@router.post('/bulk', response_model=EnrollmentBulkResponse, status_code=status.HTTP_200_OK)
+async def create_enrollments_bulk(
+    enrollments: List[EnrollmentIn],
+    service: EnrollmentService = Depends(),
+):
+    if len(enrollments) > settings.BULK_ENROLLMENT_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {settings.BULK_ENROLLMENT_MAX_ITEMS} enrollments per request',
+        )
+
+    results = await service.create_enrollments_bulk_async(enrollments)
+    return ORJSONResponse(
+        content=EnrollmentBulkResponse(results=[bulk_item(result) for result in results])
+    )
+
+
+def bulk_item(result) -> EnrollmentBulkItem:
+    if isinstance(result, Exception):
+        return EnrollmentBulkItem(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message='Failed to create enrollment',
+        )
+
+    status_info = STATUS_RESPONSE[result.status]
+    return EnrollmentBulkItem(
+        status_code=status_info['status_code'],
+        message=status_info['message'],
+        data=result if result.status == 'pending' else None,
+    )
+
+
+@router.post('/import', status_code=status.HTTP_200_OK)
+async def import_enrollments(
+    request: Request,
+    fmt: str = Query(default='ndjson', alias='format', pattern='^(ndjson|csv)$'),
+    service: EnrollmentService = Depends(),
+):
+    events = EnrollmentImportService(service).run(iter_lines(request.stream()), fmt)
+    return DuplexStreamingResponse(
+        (dumps(event) + b'\n' async for event in events),
+        media_type='application/x-ndjson',
+    )
+
+
 @router.get('/{enrollment_id}', response_model=EnrollmentOut, status_code=status.HTTP_200_OK)
-def check_enrollment(
+async def check_enrollment(
     enrollment_id: str,
     service: EnrollmentService = Depends(),
 ):
     try:
-        response = service.get_enrollment(enrollment_id)
+        response = await service.get_enrollment_async(enrollment_id)
     except EnrollmentNotFoundError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Enrollment not found')
     except RuntimeError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-    return response
+    return ORJSONResponse(content=response)
+
+
+@router.get('/{enrollment_id}/wait', response_model=EnrollmentOut, status_code=status.HTTP_200_OK)
+async def wait_enrollment(
+    enrollment_id: str,
+    timeout: float = Query(default=30.0, gt=0, le=settings.ENROLLMENT_WAIT_MAX_TIMEOUT_SECONDS),
+    service: EnrollmentService = Depends(),
+):
+    enrollment = None
+    try:
+        async for enrollment in service.watch_enrollment_async(enrollment_id, timeout):
+            pass
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    if enrollment is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Enrollment not found')
+
+    return ORJSONResponse(content=enrollment)
+
+
+@router.get('/{enrollment_id}/events', status_code=status.HTTP_200_OK)
+async def stream_enrollment_events(
+    enrollment_id: str,
+    timeout: float = Query(default=30.0, gt=0, le=settings.ENROLLMENT_WAIT_MAX_TIMEOUT_SECONDS),
+    service: EnrollmentService = Depends(),
+):
+    async def events():
+        async for enrollment in service.watch_enrollment_async(enrollment_id, timeout):
+            yield f'event: status\ndata: {enrollment.model_dump_json()}\n\n'
+        yield 'event: end\ndata: {}\n\n'
+
+    return StreamingResponse(
+        events(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'}
+    )
@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+
+from finaluser.config import settings
+
+
+class AWSClients:
+    """Process-wide registry of pooled boto3 clients.
+
+    Low-level clients are built once and shared by every request: botocore
+    clients are thread-safe and keep their connection pool (and TLS sessions)
+    alive between calls. boto3 resources are not thread-safe, so each thread gets
+    its own lightweight DynamoDB resource and Table objects, all wrapping the one
+    shared low-level client; they are dropped together with their thread.
+
+    Async callers go through ``call``, which runs the blocking boto3 call on a
+    dedicated executor with one worker per pooled connection, so in-flight AWS
+    calls are bounded by the pool size rather than by Starlette's threadpool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._dynamodb = None
+        self._generation = 0
+        self._sqs = None
+        self._long_poll_sqs = {}
+        self._queue_url = None
+        self._queue_urls = {}
+        self._executor = None
+
+    @staticmethod
+    def _client_kwargs(read_timeout: float = settings.AWS_READ_TIMEOUT) -> dict:
+        return {
+            'endpoint_url': settings.AWS_ENDPOINT_URL,
+            'region_name': settings.AWS_DEFAULT_REGION,
+            'aws_access_key_id': settings.AWS_ACCESS_KEY_ID,
+            'aws_secret_access_key': settings.AWS_SECRET_ACCESS_KEY,
+            'config': Config(
+                max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+                connect_timeout=settings.AWS_CONNECT_TIMEOUT,
+                read_timeout=read_timeout,
+                tcp_keepalive=settings.AWS_TCP_KEEPALIVE,
+                retries={'max_attempts': settings.AWS_MAX_ATTEMPTS, 'mode': 'standard'},
+            ),
+        }
+
+    @property
+    def dynamodb(self):
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            with self._lock:
+                if self._dynamodb is None:
+                    self._dynamodb = boto3.resource('dynamodb', **self._client_kwargs())
+                shared = self._dynamodb
+            local.dynamodb = type(shared)(client=shared.meta.client)
+            local.tables = {}
+            local.generation = self._generation
+        return local.dynamodb
+
+    @property
+    def sqs(self):
+        if self._sqs is None:
+            with self._lock:
+                if self._sqs is None:
+                    self._sqs = boto3.client('sqs', **self._client_kwargs())
+        return self._sqs
+
+    def long_poll_sqs(self, wait_seconds: int):
+        """SQS client whose read timeout outlasts a ``wait_seconds`` long poll.
+
+        The shared client times out after ``AWS_READ_TIMEOUT``, which an idle
+        ``ReceiveMessage`` with a longer ``WaitTimeSeconds`` would always hit.
+        """
+        client = self._long_poll_sqs.get(wait_seconds)
+        if client is None:
+            with self._lock:
+                client = self._long_poll_sqs.get(wait_seconds)
+                if client is None:
+                    client = self._long_poll_sqs[wait_seconds] = boto3.client(
+                        'sqs', **self._client_kwargs(wait_seconds + settings.AWS_READ_TIMEOUT)
+                    )
+        return client
+
+    @property
+    def queue_url(self) -> str:
+        if self._queue_url is None:
+            response = self.sqs.get_queue_url(QueueName=settings.QUEUE_NAME)
+            self._queue_url = response['QueueUrl']
+        return self._queue_url
+
+    def named_queue_url(self, name: str) -> str:
+        url = self._queue_urls.get(name)
+        if url is None:
+            url = self.sqs.get_queue_url(QueueName=name)['QueueUrl']
+            self._queue_urls[name] = url
+        return url
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.AWS_MAX_POOL_CONNECTIONS,
+                        thread_name_prefix='aws',
+                    )
+        return self._executor
+
+    async def call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def table(self, name: str):
+        dynamodb = self.dynamodb
+        tables = self._local.tables
+        table = tables.get(name)
+        if table is None:
+            table = tables[name] = dynamodb.Table(name)
+        return table
+
+    def open(self) -> 'AWSClients':
+        self.dynamodb
+        self.sqs
+        return self
+
+    def close(self):
+        with self._lock:
+            if self._dynamodb is not None:
+                self._dynamodb.meta.client.close()
+            if self._sqs is not None:
+                self._sqs.close()
+            for client in self._long_poll_sqs.values():
+                client.close()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+            self._dynamodb = None
+            self._generation += 1
+            self._sqs = None
+            self._long_poll_sqs = {}
+            self._executor = None
+            self._queue_urls = {}
+
+
+aws_clients = AWSClients()
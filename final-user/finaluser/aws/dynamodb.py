@@ -1,21 +1,22 @@
-import boto3
-
+from finaluser.aws.clients import aws_clients
 from finaluser.config import settings
 
 
 def get_dynamodb_resource():
-    return boto3.resource(
-        'dynamodb',
-        endpoint_url=settings.AWS_ENDPOINT_URL,
-        region_name=settings.AWS_DEFAULT_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    return aws_clients.dynamodb
 
 
 def get_age_groups_table():
-    return get_dynamodb_resource().Table(settings.AGE_GROUPS_TABLE)
+    return aws_clients.table(settings.AGE_GROUPS_TABLE)
+
+
+def get_age_groups_config_table():
+    return aws_clients.table(settings.AGE_GROUPS_CONFIG_TABLE)
 
 
 def get_enrollments_table():
-    return get_dynamodb_resource().Table(settings.ENROLLMENTS_TABLE)
+    return aws_clients.table(settings.ENROLLMENTS_TABLE)
+
+
+def get_idempotency_table():
+    return aws_clients.table(settings.IDEMPOTENCY_TABLE)
@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from finaluser.exceptions import EnrollmentSQSError
+from finaluser.logger import get_logger
+
+logger = get_logger()
+
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+_STOP = object()
+
+MessageAttributes = Dict[str, Dict[str, str]]
+PendingMessage = Tuple[str, int, Future, Optional[MessageAttributes]]
+
+
+def message_size(body: str, attributes: Optional[MessageAttributes] = None) -> int:
+    """Size SQS charges against the 256 KB limit: body plus attribute names, types and values."""
+    size = len(body.encode())
+    for name, attribute in (attributes or {}).items():
+        size += len(name.encode()) + len(attribute['DataType'].encode())
+        size += len(attribute.get('StringValue', '').encode())
+    return size
+
+
+class SQSBatchPublisher:
+    """Buffers outgoing messages and sends them with ``send_message_batch``.
+
+    A dispatcher thread collects messages until the batch holds 10 entries,
+    would exceed 256 KB, or the first message has waited ``max_linger_ms``. Each
+    batch is sent from ``executor`` so several batches can be in flight, and every
+    caller's future is resolved with its own entry of the batch response.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable,
+        queue_url_factory: Callable[[], str],
+        executor_factory: Callable[[], Executor],
+        max_linger_ms: float,
+    ):
+        self._client_factory = client_factory
+        self._queue_url_factory = queue_url_factory
+        self._executor_factory = executor_factory
+        self._max_linger = max_linger_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, body: str, attributes: Optional[MessageAttributes] = None) -> Future:
+        future = Future()
+        size = message_size(body, attributes)
+        if size > MAX_BATCH_BYTES:
+            logger.error(f'Message of {size} bytes exceeds the SQS limit | error: aws')
+            future.set_exception(EnrollmentSQSError())
+            return future
+
+        self._ensure_started()
+        self._queue.put((body, size, future, attributes))
+        return future
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._dispatch, name='sqs-publisher', daemon=True
+                    )
+                    self._thread.start()
+
+    def _dispatch(self):
+        carry: Optional[PendingMessage] = None
+        stopping = False
+        while not stopping:
+            message = carry or self._queue.get()
+            carry = None
+            if message is _STOP:
+                return
+
+            batch: List[PendingMessage] = [message]
+            batch_bytes = message[1]
+            deadline = time.monotonic() + self._max_linger
+            while len(batch) < MAX_BATCH_ENTRIES:
+                try:
+                    message = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+
+                if message is _STOP:
+                    stopping = True
+                    break
+                if batch_bytes + message[1] > MAX_BATCH_BYTES:
+                    carry = message
+                    break
+
+                batch.append(message)
+                batch_bytes += message[1]
+
+            self._executor_factory().submit(self._flush, batch)
+
+    def _flush(self, batch: List[PendingMessage]):
+        futures = {str(position): message[2] for position, message in enumerate(batch)}
+        entries = []
+        for position, (body, _, _, attributes) in enumerate(batch):
+            entry = {'Id': str(position), 'MessageBody': body}
+            if attributes:
+                entry['MessageAttributes'] = attributes
+            entries.append(entry)
+
+        try:
+            response = self._client_factory().send_message_batch(
+                QueueUrl=self._queue_url_factory(), Entries=entries
+            )
+        except Exception as e:
+            logger.error(f'Exception when sending message batch to SQS: {e} | error: aws')
+            for future in futures.values():
+                future.set_exception(EnrollmentSQSError())
+            return
+
+        for entry in response.get('Successful', []):
+            futures.pop(entry['Id']).set_result(entry)
+
+        for entry in response.get('Failed', []):
+            logger.error(f'SQS rejected batch entry: {entry} | error: aws')
+            futures.pop(entry['Id']).set_exception(EnrollmentSQSError())
+
+        for future in futures.values():
+            future.set_exception(EnrollmentSQSError())
@@ -0,0 +1,147 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from finaluser.logger import get_logger
+
+logger = get_logger()
+
+
+class AgeGroupIndex:
+    """Process-wide, in-memory view of the age groups table.
+
+    Groups are kept sorted by ``min_age`` so a lookup is a binary search over the
+    interval starts. The index is loaded on first use and, once older than
+    ``ttl_seconds``, refreshed by a background thread while the stale snapshot
+    keeps being served.
+
+    While a change feed is attached, ``apply`` patches the snapshot with each
+    consecutive configuration version and falls back to a full reload when a
+    version is missing. Publishing is best effort, so the TTL then only triggers
+    a ``version_loader`` check, and the table is reloaded only when the stored
+    version is ahead of the snapshot.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], List[Dict]],
+        ttl_seconds: float,
+        version_loader: Optional[Callable[[], int]] = None,
+    ):
+        self._loader = loader
+        self._version_loader = version_loader
+        self._ttl_seconds = ttl_seconds
+        self._load_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._refreshing = threading.Event()
+        self._feed_attached = threading.Event()
+        self._snapshot: Tuple[List[int], List[Dict]] = ([], [])
+        self._version: Optional[int] = None
+        self._loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def get(self, age: int) -> Optional[Dict]:
+        if not self.loaded:
+            with self._load_lock:
+                if not self.loaded:
+                    self.refresh()
+        elif time.monotonic() - self._loaded_at > self._ttl_seconds and (
+            self._version_loader or not self._feed_attached.is_set()
+        ):
+            self._refresh_in_background()
+
+        starts, groups = self._snapshot
+        position = bisect.bisect_right(starts, age) - 1
+        if position < 0:
+            return None
+
+        group = groups[position]
+        return group if age <= group['max_age'] else None
+
+    def refresh(self):
+        with self._write_lock:
+            self._refresh_locked()
+
+    def apply(self, event: Dict):
+        """Apply one change event (``op``, ``version`` and the group or its id)."""
+        with self._write_lock:
+            if not self.loaded:
+                return
+
+            version = int(event['version'])
+            if self._version is not None and version <= self._version:
+                return
+
+            if (
+                self._version is None
+                or version != self._version + 1
+                or event['op'] not in {'created', 'deleted'}
+            ):
+                logger.info(f'Reloading age group index at version {version}')
+                self._refresh_locked()
+                return
+
+            removed_id = event['group']['id'] if event['op'] == 'created' else event['id']
+            groups = [group for group in self._snapshot[1] if group['id'] != removed_id]
+            if event['op'] == 'created':
+                groups.append(event['group'])
+            self._install(groups, version)
+
+    def attach_feed(self):
+        self._feed_attached.set()
+
+    def detach_feed(self):
+        self._feed_attached.clear()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _check_version(self):
+        version = self._version_loader()
+        with self._write_lock:
+            if self._version is not None and version <= self._version:
+                self._loaded_at = time.monotonic()
+                return
+
+            logger.info(f'Age group version {version} is ahead of the feed, reloading index')
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        version = self._version_loader() if self._version_loader else None
+        self._install(self._loader(), version)
+
+    def _install(self, groups: List[Dict], version: Optional[int]):
+        groups = sorted(
+            (group for group in groups if 'min_age' in group and 'max_age' in group),
+            key=lambda group: group['min_age'],
+        )
+        self._snapshot = ([int(group['min_age']) for group in groups], groups)
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+    def _refresh_in_background(self):
+        with self._load_lock:
+            if self._refreshing.is_set():
+                return
+            self._refreshing.set()
+
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            if self._feed_attached.is_set() and self._version_loader:
+                self._check_version()
+            else:
+                self.refresh()
+        except Exception as e:
+            logger.error(f'Error refreshing age group index: {e} | error: cache')
+        finally:
+            self._refreshing.clear()
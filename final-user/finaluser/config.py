@@ -10,10 +10,42 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str
     AWS_DEFAULT_REGION: str
     AWS_ENDPOINT_URL: str
+    AWS_MAX_POOL_CONNECTIONS: int = 100
+    AWS_CONNECT_TIMEOUT: float = 2.0
+    AWS_READ_TIMEOUT: float = 5.0
+    AWS_TCP_KEEPALIVE: bool = True
+    AWS_MAX_ATTEMPTS: int = 3
 
     AGE_GROUPS_TABLE: str
+    AGE_GROUPS_CONFIG_TABLE: str = 'AgeGroupsConfig'
     ENROLLMENTS_TABLE: str
     QUEUE_NAME: str
 
+    AGE_GROUP_INDEX_TTL_SECONDS: float = 30.0
+    AGE_GROUP_EVENTS_QUEUE: str = ''
+    AGE_GROUP_EVENTS_WAIT_SECONDS: int = 20
+    AGE_GROUP_EVENTS_RETRY_SECONDS: float = 5.0
+    SQS_PUBLISH_MAX_LINGER_MS: float = 5.0
+    SQS_PUBLISH_TIMEOUT_SECONDS: float = 10.0
+
+    ENROLLMENT_CACHE_MAX_SIZE: int = 10000
+    ENROLLMENT_CACHE_TERMINAL_TTL_SECONDS: float = 300.0
+    ENROLLMENT_CACHE_TRANSIENT_TTL_SECONDS: float = 1.0
+    ENROLLMENT_CACHE_NEGATIVE_TTL_SECONDS: float = 0.3
+
+    ENROLLMENT_WATCH_POLL_INTERVAL_SECONDS: float = 0.5
+    ENROLLMENT_WAIT_MAX_TIMEOUT_SECONDS: float = 60.0
+
+    IDEMPOTENCY_TABLE: str = ''
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_CACHE_MAX_SIZE: int = 10000
+
+    BULK_ENROLLMENT_MAX_ITEMS: int = 500
+    BULK_ENROLLMENT_CONCURRENCY: int = 32
+
+    IMPORT_MAX_IN_FLIGHT: int = 64
+    IMPORT_PROGRESS_EVERY: int = 1000
+    IMPORT_MAX_LINE_BYTES: int = 64 * 1024
+
 
 settings = Settings()
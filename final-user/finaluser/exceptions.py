@@ -4,3 +4,7 @@ class EnrollmentNotFoundError(Exception):
 
 class EnrollmentSQSError(Exception):
     pass
+
+
+class IdempotencyKeyConflictError(Exception):
+    pass
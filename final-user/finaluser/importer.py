@@ -0,0 +1,56 @@
+"""Stream an NDJSON or CSV file of enrollments through the enrollment service.
+
+Usage: python -m finaluser.importer <path> [--format ndjson|csv]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import AsyncIterator
+
+from finaluser.aws.clients import aws_clients
+from finaluser.services.enrollment import EnrollmentService, enrollment_publisher
+from finaluser.services.enrollment_import import (
+    IMPORT_FORMATS,
+    EnrollmentImportService,
+    iter_lines,
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def read_chunks(path: str) -> AsyncIterator[bytes]:
+    with open(path, 'rb') as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def run_import(path: str, fmt: str) -> int:
+    failed = 0
+    lines = iter_lines(read_chunks(path))
+    async for event in EnrollmentImportService(EnrollmentService()).run(lines, fmt):
+        print(json.dumps(event), flush=True)
+        if event['event'] == 'summary':
+            failed = event.get('failed', 0) + event.get('invalid', 0)
+    return failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Import enrollments from a file.')
+    parser.add_argument('path')
+    parser.add_argument('--format', dest='fmt', choices=IMPORT_FORMATS, default=None)
+    args = parser.parse_args()
+    fmt = args.fmt or ('csv' if args.path.endswith('.csv') else 'ndjson')
+
+    try:
+        failed = asyncio.run(run_import(args.path, fmt))
+    finally:
+        enrollment_publisher.close()
+        aws_clients.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,32 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from finaluser.api import enrollment_router
+from finaluser.api.responses import ORJSONResponse
+from finaluser.aws.clients import aws_clients
+from finaluser.config import settings
+from finaluser.services.age_group_events import age_group_subscriber
+from finaluser.services.enrollment import enrollment_publisher, enrollment_watcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.aws_clients = aws_clients.open()
+    if settings.AGE_GROUP_EVENTS_QUEUE:
+        age_group_subscriber.start()
+    yield
+    age_group_subscriber.close()
+    enrollment_watcher.close()
+    enrollment_publisher.close()
+    aws_clients.close()
+
 
-app = FastAPI(title='Final User API', version='0.1.0')
+app = FastAPI(
+    title='Final User API',
+    version='0.1.0',
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.include_router(enrollment_router, prefix='/api/v1/enrollments', tags=['Enrollments'])
@@ -1,24 +1,45 @@
-from boto3.dynamodb.conditions import Attr
+from typing import Dict, List, Optional
+
 from botocore.exceptions import ClientError
 
-from finaluser.aws.dynamodb import get_age_groups_table
+from finaluser.aws.clients import aws_clients
+from finaluser.aws.dynamodb import get_age_groups_config_table, get_age_groups_table
+from finaluser.cache.age_group_index import AgeGroupIndex
+from finaluser.config import settings
 from finaluser.logger import get_logger
 
 logger = get_logger()
 
 
 class AgeGroupRepository:
-    def __init__(self):
-        self.table = get_age_groups_table()
-
-    def get_by_age(self, age: int):
+    @property
+    def table(self):
+        return get_age_groups_table()
+
+    @property
+    def config_table(self):
+        return get_age_groups_config_table()
+
+    def get_version(self) -> int:
+        response = self.config_table.get_item(Key={'id': 'age_groups'}, ConsistentRead=True)
+        return int(response.get('Item', {}).get('version', 0))
+
+    def get_all(self) -> List[Dict]:
+        items = []
+        scan_kwargs = {}
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            items.extend(response.get('Items', []))
+
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                return items
+            scan_kwargs['ExclusiveStartKey'] = last_evaluated_key
+
+    @staticmethod
+    def get_by_age(age: int) -> Optional[Dict]:
         try:
-            response = self.table.scan(
-                FilterExpression=Attr('min_age').lte(age) & Attr('max_age').gte(age)
-            )
-
-            items = response.get('Items', [])
-            return items[0] if items else None
+            return age_group_index.get(age)
 
         except ClientError:
             logger.error('Error getting age group id by age | error: respositories')
@@ -27,3 +48,15 @@ class AgeGroupRepository:
         except Exception:
             logger.error('Unexpected error getting age group id by age | error: respositories')
             raise RuntimeError('Unexpected error occurred')
+
+    async def get_by_age_async(self, age: int) -> Optional[Dict]:
+        if age_group_index.loaded:
+            return self.get_by_age(age)
+        return await aws_clients.call(self.get_by_age, age)
+
+
+age_group_index = AgeGroupIndex(
+    loader=lambda: AgeGroupRepository().get_all(),
+    version_loader=lambda: AgeGroupRepository().get_version(),
+    ttl_seconds=settings.AGE_GROUP_INDEX_TTL_SECONDS,
+)
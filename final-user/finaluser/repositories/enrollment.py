@@ -1,17 +1,21 @@
-from typing import Optional
+from typing import Dict, List, Optional
 
 from botocore.exceptions import ClientError
 
-from finaluser.aws.dynamodb import get_enrollments_table
+from finaluser.aws.clients import aws_clients
+from finaluser.aws.dynamodb import get_dynamodb_resource, get_enrollments_table
 from finaluser.logger import get_logger
 from finaluser.schemas.enrollment import EnrollmentOut
 
 logger = get_logger()
 
+BATCH_GET_MAX_KEYS = 100
+
 
 class EnrollmentRepository:
-    def __init__(self):
-        self.table = get_enrollments_table()
+    @property
+    def table(self):
+        return get_enrollments_table()
 
     def get_by_id(self, enrollment_id: str) -> Optional[EnrollmentOut]:
         try:
@@ -30,6 +34,26 @@ class EnrollmentRepository:
             logger.error('Error getting enrollment by id | error: respositories')
             raise RuntimeError('Failed to get enrollment by id')
 
+    def get_many(self, enrollment_ids: List[str]) -> Dict[str, EnrollmentOut]:
+        dynamodb = get_dynamodb_resource()
+        table_name = self.table.name
+        enrollments = {}
+        try:
+            for start in range(0, len(enrollment_ids), BATCH_GET_MAX_KEYS):
+                chunk = enrollment_ids[start : start + BATCH_GET_MAX_KEYS]
+                request = {table_name: {'Keys': [{'id': enrollment_id} for enrollment_id in chunk]}}
+                while request:
+                    response = dynamodb.batch_get_item(RequestItems=request)
+                    for item in response.get('Responses', {}).get(table_name, []):
+                        enrollments[item['id']] = EnrollmentOut(**item)
+                    request = response.get('UnprocessedKeys')
+
+        except ClientError:
+            logger.error('Error getting enrollments by id | error: respositories')
+            raise RuntimeError('Failed to get enrollments by id')
+
+        return enrollments
+
     def get_by_cpf(self, cpf: str) -> Optional[EnrollmentOut]:
         try:
             enrollment = self.table.query(
@@ -45,3 +69,9 @@ class EnrollmentRepository:
         except ClientError as e:
             logger.error(f'Error fetching enrollment by CPF: {e} | error: respositories')
             return None
+
+    async def get_by_id_async(self, enrollment_id: str) -> Optional[EnrollmentOut]:
+        return await aws_clients.call(self.get_by_id, enrollment_id)
+
+    async def get_by_cpf_async(self, cpf: str) -> Optional[dict]:
+        return await aws_clients.call(self.get_by_cpf, cpf)
@@ -0,0 +1,38 @@
+import time
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from finaluser.aws.dynamodb import get_idempotency_table
+from finaluser.logger import get_logger
+
+logger = get_logger()
+
+
+class IdempotencyRepository:
+    @property
+    def table(self):
+        return get_idempotency_table()
+
+    def get(self, idempotency_key: str) -> Optional[dict]:
+        try:
+            item = self.table.get_item(Key={'idempotency_key': idempotency_key}).get('Item')
+        except ClientError as e:
+            logger.error(f'Error getting idempotency record: {e} | error: respositories')
+            return None
+
+        if not item or item['expires_at'] <= time.time():
+            return None
+
+        return item
+
+    def save(self, idempotency_key: str, record: dict, ttl_seconds: int):
+        item = {
+            'idempotency_key': idempotency_key,
+            **record,
+            'expires_at': int(time.time() + ttl_seconds),
+        }
+        try:
+            self.table.put_item(Item=item)
+        except ClientError as e:
+            logger.error(f'Error saving idempotency record: {e} | error: respositories')
@@ -1,10 +1,14 @@
 import re
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
+def normalize_cpf(cpf: str) -> str:
+    return re.sub(r'\D', '', cpf)
+
+
 class EnrollmentStatus(str, Enum):
     pending = 'pending'
     approved = 'approved'
@@ -45,3 +49,13 @@ class EnrollmentOut(EnrollmentBase):
 class EnrollmentResponse(BaseModel):
     message: str = Field(description='Response message')
     data: Optional[EnrollmentOut] = Field(default=None, description='Enrollment data')
+
+
+class EnrollmentBulkItem(BaseModel):
+    status_code: int = Field(description='HTTP status the single-item endpoint would return')
+    message: str = Field(description='Response message')
+    data: Optional[EnrollmentOut] = Field(default=None, description='Enrollment data')
+
+
+class EnrollmentBulkResponse(BaseModel):
+    results: List[EnrollmentBulkItem] = Field(description='One result per submitted enrollment')
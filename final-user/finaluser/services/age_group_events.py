@@ -0,0 +1,100 @@
+import json
+import threading
+from typing import Dict, Optional
+
+from finaluser.aws.clients import aws_clients
+from finaluser.cache.age_group_index import AgeGroupIndex
+from finaluser.config import settings
+from finaluser.logger import get_logger
+from finaluser.repositories.age_group import age_group_index
+
+logger = get_logger()
+
+
+class AgeGroupEventSubscriber:
+    """Background consumer of the age group change feed published by configurationuser.
+
+    A single thread long-polls the queue and hands each event to the index,
+    which applies it incrementally. While the queue is reachable the index is
+    held indefinitely; when receiving fails the feed is detached so the TTL
+    refresh takes over until the queue is back.
+    """
+
+    def __init__(
+        self,
+        index: AgeGroupIndex,
+        queue_name: str,
+        wait_seconds: int,
+        retry_seconds: float,
+    ):
+        self._index = index
+        self._queue_name = queue_name
+        self._wait_seconds = wait_seconds
+        self._retry_seconds = retry_seconds
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='age-group-events', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stopping.set()
+        self._index.detach_feed()
+        self._thread = None
+
+    def poll(self) -> int:
+        """Receive and apply one batch of events; returns how many were handled."""
+        queue_url = aws_clients.named_queue_url(self._queue_name)
+        sqs = aws_clients.long_poll_sqs(self._wait_seconds)
+        response = sqs.receive_message(
+            QueueUrl=queue_url,
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=self._wait_seconds,
+        )
+        self._index.attach_feed()
+
+        messages = response.get('Messages', [])
+        for message in messages:
+            self._apply(message)
+
+        if messages:
+            sqs.delete_message_batch(
+                QueueUrl=queue_url,
+                Entries=[
+                    {'Id': str(position), 'ReceiptHandle': message['ReceiptHandle']}
+                    for position, message in enumerate(messages)
+                ],
+            )
+        return len(messages)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f'Error receiving age group events: {e} | error: services')
+                self._index.detach_feed()
+                self._stopping.wait(self._retry_seconds)
+
+    def _apply(self, message: Dict):
+        try:
+            self._index.apply(json.loads(message['Body']))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f'Invalid age group event, reloading index: {e} | error: services')
+            self._index.invalidate()
+        except Exception as e:
+            logger.error(f'Error applying age group event: {e} | error: services')
+            self._index.invalidate()
+
+
+age_group_subscriber = AgeGroupEventSubscriber(
+    age_group_index,
+    settings.AGE_GROUP_EVENTS_QUEUE,
+    wait_seconds=settings.AGE_GROUP_EVENTS_WAIT_SECONDS,
+    retry_seconds=settings.AGE_GROUP_EVENTS_RETRY_SECONDS,
+)
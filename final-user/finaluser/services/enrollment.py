@@ -1,8 +1,16 @@
+import asyncio
 import json
 import uuid
-from http import HTTPStatus
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
+from finaluser.aws.clients import aws_clients
 from finaluser.aws.sqs_aws import get_queue_url, get_sqs_client
+from finaluser.aws.sqs_publisher import SQSBatchPublisher
+from finaluser.cache.lru import MISSING, TTLCache
+from finaluser.cache.single_flight import SingleFlight
+from finaluser.config import settings
 from finaluser.exceptions import EnrollmentNotFoundError, EnrollmentSQSError
 from finaluser.logger import get_logger
 from finaluser.repositories.age_group import AgeGroupRepository
@@ -11,10 +19,44 @@ from finaluser.schemas.enrollment import (
     EnrollmentIn,
     EnrollmentOut,
     EnrollmentStatus,
+    normalize_cpf,
 )
+from finaluser.services.enrollment_watcher import EnrollmentWatcher
 
 logger = get_logger()
 
+enrollment_publisher = SQSBatchPublisher(
+    client_factory=lambda: get_sqs_client(),  # noqa: PLW0108
+    queue_url_factory=lambda: get_queue_url(),  # noqa: PLW0108
+    executor_factory=lambda: aws_clients.executor,
+    max_linger_ms=settings.SQS_PUBLISH_MAX_LINGER_MS,
+)
+
+enrollment_cache = TTLCache(max_size=settings.ENROLLMENT_CACHE_MAX_SIZE)
+
+enrollment_flights = SingleFlight()
+
+enrollment_watcher = EnrollmentWatcher(
+    fetch_many=lambda enrollment_ids: EnrollmentRepository().get_many(enrollment_ids),
+    interval_seconds=settings.ENROLLMENT_WATCH_POLL_INTERVAL_SECONDS,
+    on_fetch=lambda enrollment_id, enrollment: EnrollmentService.cache_enrollment(  # noqa: PLW0108
+        enrollment_id, enrollment
+    ),
+)
+
+TERMINAL_STATUSES = (EnrollmentStatus.approved, EnrollmentStatus.rejected)
+
+# Wire format v2: compact keys, no whitespace, version and routing data in attributes.
+MESSAGE_SCHEMA_VERSION = '2'
+MESSAGE_KEYS = {
+    'id': 'i',
+    'name': 'n',
+    'cpf': 'c',
+    'age': 'a',
+    'status': 's',
+    'age_group_id': 'g',
+}
+
 
 class EnrollmentService:
     def __init__(self):
@@ -22,27 +64,119 @@ class EnrollmentService:
         self.age_group_repository = AgeGroupRepository()
 
     def create_enrollment(self, enrollment: EnrollmentIn) -> EnrollmentOut:
+        return enrollment_flights.do(
+            normalize_cpf(enrollment.cpf), lambda: self._create_enrollment(enrollment)
+        )
+
+    async def create_enrollment_async(self, enrollment: EnrollmentIn) -> EnrollmentOut:
+        return await enrollment_flights.do_async(
+            normalize_cpf(enrollment.cpf), lambda: self._create_enrollment_async(enrollment)
+        )
+
+    def _create_enrollment(self, enrollment: EnrollmentIn) -> EnrollmentOut:
         enrollment_exists = self.repository.get_by_cpf(enrollment.cpf)
+        age = enrollment_exists.get('age') if enrollment_exists else enrollment.age
+        age_group = self.age_group_repository.get_by_age(age)
+
+        enrollment_out, publish = self.build_enrollment(enrollment, enrollment_exists, age_group)
+        if publish:
+            self.publish_enrollment_message(enrollment_out)
+            self.invalidate_enrollment(enrollment_out.id)
+
+        return enrollment_out
+
+    async def _create_enrollment_async(self, enrollment: EnrollmentIn) -> EnrollmentOut:
+        enrollment_exists = await self.repository.get_by_cpf_async(enrollment.cpf)
+        age = enrollment_exists.get('age') if enrollment_exists else enrollment.age
+        age_group = await self.age_group_repository.get_by_age_async(age)
+
+        enrollment_out, publish = self.build_enrollment(enrollment, enrollment_exists, age_group)
+        if publish:
+            await self.publish_enrollment_message_async(enrollment_out)
+            self.invalidate_enrollment(enrollment_out.id)
+
+        return enrollment_out
+
+    async def create_enrollments_bulk_async(
+        self, enrollments: List[EnrollmentIn]
+    ) -> List[Union[EnrollmentOut, Exception]]:
+        """Create many enrollments at once, returning a result or an error per item.
+
+        CPF lookups run concurrently (bounded by BULK_ENROLLMENT_CONCURRENCY) and
+        once per distinct CPF, age groups are resolved from the in-memory index,
+        and every message is handed to the batching publisher before any is
+        awaited, so SQS receives full send_message_batch requests.
+        """
+        semaphore = asyncio.Semaphore(settings.BULK_ENROLLMENT_CONCURRENCY)
+
+        async def lookup(cpf: str) -> Optional[dict]:
+            async with semaphore:
+                return await self.repository.get_by_cpf_async(cpf)
+
+        cpfs = list(dict.fromkeys(enrollment.cpf for enrollment in enrollments))
+        lookups = await asyncio.gather(*(lookup(cpf) for cpf in cpfs), return_exceptions=True)
+        existing_by_cpf = dict(zip(cpfs, lookups))
+
+        results: dict = {}
+        publishing = []
+        for enrollment in enrollments:
+            if enrollment.cpf in results:
+                continue
+
+            enrollment_exists = existing_by_cpf[enrollment.cpf]
+            if isinstance(enrollment_exists, Exception):
+                results[enrollment.cpf] = enrollment_exists
+                continue
+
+            age = enrollment_exists.get('age') if enrollment_exists else enrollment.age
+            try:
+                age_group = await self.age_group_repository.get_by_age_async(age)
+            except RuntimeError as e:
+                results[enrollment.cpf] = e
+                continue
+
+            enrollment_out, publish = self.build_enrollment(
+                enrollment, enrollment_exists, age_group
+            )
+            results[enrollment.cpf] = enrollment_out
+            if publish:
+                future = asyncio.wrap_future(self.submit_enrollment_message(enrollment_out))
+                publishing.append((enrollment.cpf, future))
+
+        if publishing:
+            done, _ = await asyncio.wait(
+                [future for _, future in publishing],
+                timeout=settings.SQS_PUBLISH_TIMEOUT_SECONDS,
+            )
+            for cpf, future in publishing:
+                if future not in done:
+                    logger.error(f'Timed out publishing enrollment for {cpf} | error: services')
+                    results[cpf] = EnrollmentSQSError()
+                elif future.exception():
+                    results[cpf] = future.exception()
+                else:
+                    self.invalidate_enrollment(results[cpf].id)
+
+        return [results[enrollment.cpf] for enrollment in enrollments]
+
+    @staticmethod
+    def build_enrollment(
+        enrollment: EnrollmentIn,
+        enrollment_exists: Optional[dict],
+        age_group: Optional[dict],
+    ) -> Tuple[EnrollmentOut, bool]:
+        """Decide the enrollment state and whether it must be published to SQS."""
         if enrollment_exists:
-            age_group = self.age_group_repository.get_by_age(enrollment_exists.get('age'))
             enrollment_out = EnrollmentOut(**enrollment_exists)
-            if enrollment_exists.get('status') == EnrollmentStatus.approved:
-                return enrollment_out
-
             if enrollment_exists.get('status') == EnrollmentStatus.rejected and age_group:
                 enrollment_out.age_group_id = age_group.get('id')
                 enrollment_out.status = EnrollmentStatus.pending
+                return enrollment_out, True
 
-                response = self.publish_enrollment_message(enrollment_out)
-                if response.get('ResponseMetadata', {}).get('HTTPStatusCode') != HTTPStatus.OK:
-                    logger.error(f'Failed to publish message to SQS: {response} | error: services')
-                    raise EnrollmentSQSError()
-            return enrollment_out
+            return enrollment_out, False
 
-        age_group = self.age_group_repository.get_by_age(enrollment.age)
-        enrollment_id = str(uuid.uuid4())
         enrollment_base = {
-            'id': enrollment_id,
+            'id': str(uuid.uuid4()),
             'name': enrollment.name,
             'cpf': enrollment.cpf,
             'age': enrollment.age,
@@ -57,16 +191,85 @@ class EnrollmentService:
                 status=EnrollmentStatus.pending,
             )
 
-        response = self.publish_enrollment_message(enrollment_out)
-        if response.get('ResponseMetadata').get('HTTPStatusCode') != HTTPStatus.OK:
-            logger.error(f'Failed to publish message to SQS: {response} | error: services')
-            raise EnrollmentSQSError()
-
-        return enrollment_out
+        return enrollment_out, True
 
     def get_enrollment(self, enrollment_id: str) -> EnrollmentOut:
-        enrollment = self.repository.get_by_id(enrollment_id)
+        enrollment = enrollment_cache.get(enrollment_id)
+        if enrollment is MISSING:
+            enrollment = self.repository.get_by_id(enrollment_id)
+            self.cache_enrollment(enrollment_id, enrollment)
+
+        return self._ensure_found(enrollment_id, enrollment)
+
+    async def get_enrollment_async(self, enrollment_id: str) -> EnrollmentOut:
+        enrollment = await self._lookup_enrollment_async(enrollment_id)
+        return self._ensure_found(enrollment_id, enrollment)
+
+    async def watch_enrollment_async(
+        self, enrollment_id: str, timeout: float
+    ) -> AsyncIterator[EnrollmentOut]:
+        """Yield the enrollment whenever its status changes, until it is terminal.
+
+        Waiting clients share the process-wide ``enrollment_watcher`` poller
+        instead of issuing their own reads. Stops silently after ``timeout``.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        updates: asyncio.Queue = asyncio.Queue()
+        unsubscribe = enrollment_watcher.subscribe(
+            enrollment_id, lambda update: loop.call_soon_threadsafe(updates.put_nowait, update)
+        )
+
+        try:
+            enrollment = await self._lookup_enrollment_async(enrollment_id)
+            last_status = getattr(enrollment, 'status', None)
+            if enrollment:
+                yield enrollment
+
+            while last_status not in TERMINAL_STATUSES:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+
+                try:
+                    enrollment = await asyncio.wait_for(updates.get(), remaining)
+                except asyncio.TimeoutError:
+                    return
+
+                status = getattr(enrollment, 'status', None)
+                if enrollment and status != last_status:
+                    last_status = status
+                    yield enrollment
+        finally:
+            unsubscribe()
+
+    async def _lookup_enrollment_async(self, enrollment_id: str) -> Optional[EnrollmentOut]:
+        enrollment = enrollment_cache.get(enrollment_id)
+        if enrollment is MISSING:
+            enrollment = await self.repository.get_by_id_async(enrollment_id)
+            self.cache_enrollment(enrollment_id, enrollment)
+
+        return enrollment
+
+    @staticmethod
+    def cache_enrollment(enrollment_id: str, enrollment: Optional[EnrollmentOut]):
+        """Cache a lookup result for as long as its status is unlikely to change."""
+        status = getattr(enrollment, 'status', None)
+        if enrollment is None:
+            ttl_seconds = settings.ENROLLMENT_CACHE_NEGATIVE_TTL_SECONDS
+        elif status == EnrollmentStatus.approved:
+            ttl_seconds = settings.ENROLLMENT_CACHE_TERMINAL_TTL_SECONDS
+        else:
+            ttl_seconds = settings.ENROLLMENT_CACHE_TRANSIENT_TTL_SECONDS
+
+        enrollment_cache.set(enrollment_id, enrollment, ttl_seconds)
+
+    @staticmethod
+    def invalidate_enrollment(enrollment_id: str):
+        enrollment_cache.invalidate(enrollment_id)
 
+    @staticmethod
+    def _ensure_found(enrollment_id: str, enrollment: Optional[EnrollmentOut]) -> EnrollmentOut:
         if not enrollment:
             logger.error(f'Enrollment with id {enrollment_id} not found | error: services')
             raise EnrollmentNotFoundError()
@@ -74,23 +277,49 @@ class EnrollmentService:
         return enrollment
 
     @staticmethod
-    def publish_enrollment_message(enrollment: EnrollmentOut):
-        sqs = get_sqs_client()
-        queue_url = get_queue_url()
-
+    def encode_enrollment_message(enrollment: EnrollmentOut) -> Tuple[str, Dict[str, dict]]:
+        status = EnrollmentStatus(enrollment.status).value
         message_body = {
-            'id': enrollment.id,
-            'name': enrollment.name,
-            'cpf': enrollment.cpf,
-            'age': enrollment.age,
-            'status': enrollment.status,
-            'age_group_id': enrollment.age_group_id,
+            MESSAGE_KEYS['id']: enrollment.id,
+            MESSAGE_KEYS['name']: enrollment.name,
+            MESSAGE_KEYS['cpf']: enrollment.cpf,
+            MESSAGE_KEYS['age']: enrollment.age,
+            MESSAGE_KEYS['status']: status,
+        }
+        if enrollment.age_group_id:
+            message_body[MESSAGE_KEYS['age_group_id']] = enrollment.age_group_id
+
+        attributes = {
+            'schema_version': {'DataType': 'Number', 'StringValue': MESSAGE_SCHEMA_VERSION},
+            'status': {'DataType': 'String', 'StringValue': status},
+            'has_age_group': {
+                'DataType': 'String',
+                'StringValue': 'true' if enrollment.age_group_id else 'false',
+            },
         }
 
+        body = json.dumps(message_body, separators=(',', ':'), ensure_ascii=False)
+        return body, attributes
+
+    @classmethod
+    def submit_enrollment_message(cls, enrollment: EnrollmentOut) -> Future:
+        return enrollment_publisher.submit(*cls.encode_enrollment_message(enrollment))
+
+    @classmethod
+    def publish_enrollment_message(cls, enrollment: EnrollmentOut) -> dict:
         try:
-            response = sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(message_body))
-        except Exception as e:
-            logger.error(f'Exception when sending message to SQS: {e} | error: services')
+            return cls.submit_enrollment_message(enrollment).result(
+                timeout=settings.SQS_PUBLISH_TIMEOUT_SECONDS
+            )
+        except FutureTimeoutError:
+            logger.error(f'Timed out publishing enrollment {enrollment.id} | error: services')
             raise EnrollmentSQSError()
 
-        return response
+    @classmethod
+    async def publish_enrollment_message_async(cls, enrollment: EnrollmentOut) -> dict:
+        future = asyncio.wrap_future(cls.submit_enrollment_message(enrollment))
+        try:
+            return await asyncio.wait_for(future, timeout=settings.SQS_PUBLISH_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.error(f'Timed out publishing enrollment {enrollment.id} | error: services')
+            raise EnrollmentSQSError()
@@ -0,0 +1,140 @@
+import asyncio
+import csv
+import json
+from collections import Counter
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from finaluser.config import settings
+from finaluser.logger import get_logger
+from finaluser.schemas.enrollment import EnrollmentIn, EnrollmentStatus
+from finaluser.services.enrollment import EnrollmentService
+
+logger = get_logger()
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = settings.IMPORT_MAX_LINE_BYTES
+) -> AsyncIterator[bytes]:
+    """Split a stream of byte chunks into raw lines without buffering the whole body.
+
+    A line that grows past ``max_line_bytes`` is yielded cut to ``max_line_bytes + 1``
+    bytes and the rest of it is dropped as it arrives, so memory stays bounded even
+    when the input never contains a newline.
+    """
+    remainder = b''
+    skipping = False
+    async for chunk in chunks:
+        remainder += chunk
+        *lines, remainder = remainder.split(b'\n')
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            yield line.rstrip(b'\r')
+
+        if len(remainder) > max_line_bytes:
+            if not skipping:
+                yield remainder[: max_line_bytes + 1]
+                skipping = True
+            remainder = b''
+
+    if remainder and not skipping:
+        yield remainder.rstrip(b'\r')
+
+
+class EnrollmentImportService:
+    """Streams enrollment rows through ``EnrollmentService.create_enrollment_async``.
+
+    Rows are parsed lazily and at most ``max_in_flight`` of them are being created
+    at any time, so memory stays constant regardless of the input size. ``run``
+    yields progress, per-row error and summary events as they happen.
+    """
+
+    def __init__(
+        self,
+        service: EnrollmentService,
+        max_in_flight: int = settings.IMPORT_MAX_IN_FLIGHT,
+        progress_every: int = settings.IMPORT_PROGRESS_EVERY,
+    ):
+        self.service = service
+        self.max_in_flight = max_in_flight
+        self.progress_every = progress_every
+
+    async def run(self, lines: AsyncIterable[bytes], fmt: str = 'ndjson') -> AsyncIterator[Dict]:
+        counts = Counter()
+        in_flight: Dict[asyncio.Task, int] = {}
+
+        def settle(done) -> List[Dict]:
+            events = []
+            for task in done:
+                line_number = in_flight.pop(task)
+                error = task.exception()
+                if error is None:
+                    counts[EnrollmentStatus(task.result().status).value] += 1
+                else:
+                    counts['failed'] += 1
+                    events.append(self._error(line_number, f'{type(error).__name__}: {error}'))
+
+                counts['processed'] += 1
+                if counts['processed'] % self.progress_every == 0:
+                    events.append({'event': 'progress', **counts})
+            return events
+
+        async for line_number, row, error in self._parse(lines, fmt):
+            if error:
+                counts['processed'] += 1
+                counts['invalid'] += 1
+                yield self._error(line_number, error)
+                continue
+
+            task = asyncio.ensure_future(self.service.create_enrollment_async(row))
+            in_flight[task] = line_number
+            if len(in_flight) >= self.max_in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for event in settle(done):
+                    yield event
+
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            for event in settle(done):
+                yield event
+
+        yield {'event': 'summary', **counts}
+
+    @staticmethod
+    async def _parse(
+        lines: AsyncIterable[bytes], fmt: str
+    ) -> AsyncIterator[Tuple[int, Optional[EnrollmentIn], Optional[str]]]:
+        header = None
+        line_number = 0
+        async for raw_line in lines:
+            line_number += 1
+            try:
+                if len(raw_line) > settings.IMPORT_MAX_LINE_BYTES:
+                    raise ValueError(f'Line exceeds {settings.IMPORT_MAX_LINE_BYTES} bytes')
+
+                line = raw_line.decode('utf-8')
+                if not line.strip():
+                    continue
+
+                if fmt == 'csv':
+                    values = next(csv.reader([line]))
+                    if header is None:
+                        header = [value.strip() for value in values]
+                        continue
+                    data = dict(zip(header, values))
+                else:
+                    data = json.loads(line)
+
+                yield line_number, EnrollmentIn.model_validate(data), None
+            except (ValueError, ValidationError) as e:
+                yield line_number, None, str(e)
+
+    @staticmethod
+    def _error(line_number: int, detail: str) -> Dict:
+        logger.warning(f'Import row {line_number} failed: {detail} | error: services')
+        return {'event': 'error', 'line': line_number, 'detail': detail}
@@ -0,0 +1,95 @@
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+
+from finaluser.logger import get_logger
+from finaluser.schemas.enrollment import EnrollmentOut
+
+logger = get_logger()
+
+Subscriber = Callable[[Optional[EnrollmentOut]], None]
+
+
+class EnrollmentWatcher:
+    """Single background poller shared by every client waiting on an enrollment.
+
+    While at least one subscriber is registered, a thread fetches all watched
+    enrollments with one batched read every ``interval_seconds`` and hands each
+    subscriber the current record (``None`` while it does not exist yet). The
+    thread exits as soon as nobody is watching.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[List[str]], Dict[str, EnrollmentOut]],
+        interval_seconds: float,
+        on_fetch: Optional[Callable[[str, Optional[EnrollmentOut]], None]] = None,
+    ):
+        self._fetch_many = fetch_many
+        self._interval_seconds = interval_seconds
+        self._on_fetch = on_fetch
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._subscribers: Dict[str, Set[Subscriber]] = defaultdict(set)
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, enrollment_id: str, subscriber: Subscriber) -> Callable[[], None]:
+        with self._lock:
+            self._subscribers[enrollment_id].add(subscriber)
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name='enrollment-watcher', daemon=True
+                )
+                self._thread.start()
+
+        def unsubscribe():
+            with self._lock:
+                subscribers = self._subscribers.get(enrollment_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[enrollment_id]
+
+        return unsubscribe
+
+    def watching(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def close(self):
+        self._stopping.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            with self._lock:
+                enrollment_ids = list(self._subscribers)
+                if not enrollment_ids:
+                    self._thread = None
+                    return
+
+            try:
+                enrollments = self._fetch_many(enrollment_ids)
+            except Exception as e:
+                logger.error(f'Error polling watched enrollments: {e} | error: services')
+            else:
+                for enrollment_id in enrollment_ids:
+                    self._notify(enrollment_id, enrollments.get(enrollment_id))
+
+            self._stopping.wait(self._interval_seconds)
+
+        with self._lock:
+            self._thread = None
+
+    def _notify(self, enrollment_id: str, enrollment: Optional[EnrollmentOut]):
+        if self._on_fetch:
+            self._on_fetch(enrollment_id, enrollment)
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(enrollment_id, ()))
+
+        for subscriber in subscribers:
+            try:
+                subscriber(enrollment)
+            except Exception as e:
+                logger.warning(f'Dropping enrollment update: {e} | error: services')
@@ -0,0 +1,70 @@
+import json
+import time
+from typing import Optional
+
+from finaluser.aws.clients import aws_clients
+from finaluser.cache.lru import MISSING, TTLCache
+from finaluser.config import settings
+from finaluser.exceptions import IdempotencyKeyConflictError
+from finaluser.logger import get_logger
+from finaluser.repositories.idempotency import IdempotencyRepository
+
+logger = get_logger()
+
+idempotency_cache = TTLCache(max_size=settings.IDEMPOTENCY_CACHE_MAX_SIZE)
+
+
+class IdempotencyService:
+    """Stores the first response sent for an ``Idempotency-Key`` and replays it.
+
+    Responses live in an in-process LRU and, when ``IDEMPOTENCY_TABLE`` is set, in
+    DynamoDB with a TTL so they survive restarts and are shared across replicas.
+    Each record keeps a fingerprint of the request so a key reused with a
+    different body is rejected instead of replayed.
+    """
+
+    def __init__(self):
+        self.repository = IdempotencyRepository() if settings.IDEMPOTENCY_TABLE else None
+
+    async def get_response_async(self, idempotency_key: str, fingerprint: str) -> Optional[dict]:
+        record = idempotency_cache.get(idempotency_key)
+        if record is MISSING:
+            record = None
+            if self.repository:
+                record = await aws_clients.call(self.repository.get, idempotency_key)
+            if record:
+                # Cache only until the stored record expires, not for a fresh TTL.
+                ttl_seconds = float(record['expires_at']) - time.time()
+                record = self._decode(record)
+                idempotency_cache.set(idempotency_key, record, ttl_seconds)
+
+        if not record:
+            return None
+
+        if record['fingerprint'] != fingerprint:
+            logger.warning(f'Idempotency key reused: {idempotency_key} | error: services')
+            raise IdempotencyKeyConflictError()
+
+        return record
+
+    async def save_response_async(
+        self, idempotency_key: str, fingerprint: str, status_code: int, content: dict
+    ):
+        record = {'fingerprint': fingerprint, 'status_code': status_code, 'content': content}
+        idempotency_cache.set(idempotency_key, record, settings.IDEMPOTENCY_TTL_SECONDS)
+
+        if self.repository:
+            await aws_clients.call(
+                self.repository.save,
+                idempotency_key,
+                {**record, 'content': json.dumps(content)},
+                settings.IDEMPOTENCY_TTL_SECONDS,
+            )
+
+    @staticmethod
+    def _decode(item: dict) -> dict:
+        return {
+            'fingerprint': item['fingerprint'],
+            'status_code': int(item['status_code']),
+            'content': json.loads(item['content']),
+        }
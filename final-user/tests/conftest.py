@@ -3,6 +3,8 @@ from fastapi.testclient import TestClient
 
 from finaluser.main import app
 from finaluser.schemas.enrollment import EnrollmentStatus
+from finaluser.services.enrollment import enrollment_cache
+from finaluser.services.idempotency import idempotency_cache
 
 
 @pytest.fixture(scope='module')
@@ -10,6 +12,12 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    enrollment_cache.clear()
+    idempotency_cache.clear()
+
+
 @pytest.fixture
 def enrollment_data():
     return {
@@ -0,0 +1,132 @@
+import json
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from finaluser.cache.age_group_index import AgeGroupIndex
+from finaluser.repositories.age_group import AgeGroupRepository
+from finaluser.services.age_group_events import AgeGroupEventSubscriber
+
+
+@pytest.fixture
+def age_groups():
+    return [
+        {'id': 'adults', 'min_age': Decimal(18), 'max_age': Decimal(59)},
+        {'id': 'children', 'min_age': Decimal(0), 'max_age': Decimal(11)},
+        {'id': 'seniors', 'min_age': Decimal(60), 'max_age': Decimal(110)},
+    ]
+
+
+@pytest.mark.parametrize(
+    ('age', 'expected_id'),
+    [(0, 'children'), (11, 'children'), (15, None), (18, 'adults'), (110, 'seniors'), (150, None)],
+)
+def test_age_group_index_lookup(age_groups, age, expected_id):
+    index = AgeGroupIndex(loader=lambda: age_groups, ttl_seconds=60)
+
+    group = index.get(age)
+
+    assert (group or {}).get('id') == expected_id
+
+
+def test_age_group_index_loads_once(age_groups):
+    loader = MagicMock(return_value=age_groups)
+    index = AgeGroupIndex(loader=loader, ttl_seconds=60)
+
+    for age in range(100):
+        index.get(age)
+
+    loader.assert_called_once()
+
+
+@patch('finaluser.repositories.age_group.get_age_groups_table')
+def test_get_all_follows_scan_pages(mock_get_table, age_groups):
+    mock_table = MagicMock()
+    mock_table.scan.side_effect = [
+        {'Items': age_groups[:2], 'LastEvaluatedKey': {'id': 'children'}},
+        {'Items': age_groups[2:]},
+    ]
+    mock_get_table.return_value = mock_table
+
+    items = AgeGroupRepository().get_all()
+
+    assert items == age_groups
+    mock_table.scan.assert_called_with(ExclusiveStartKey={'id': 'children'})
+
+
+def test_age_group_index_applies_consecutive_events(age_groups):
+    loader = MagicMock(return_value=age_groups)
+    version_loader = MagicMock(return_value=3)
+    index = AgeGroupIndex(loader=loader, ttl_seconds=60, version_loader=version_loader)
+    index.get(0)
+
+    index.apply({'op': 'deleted', 'version': 4, 'id': 'children'})
+    kids = {'id': 'kids', 'min_age': 0, 'max_age': 17}
+    index.apply({'op': 'created', 'version': 5, 'group': kids})
+    index.apply({'op': 'deleted', 'version': 2, 'id': 'adults'})
+
+    assert index.version == version_loader.return_value + 2
+    assert index.get(15)['id'] == 'kids'
+    assert index.get(30)['id'] == 'adults'
+    loader.assert_called_once()
+
+
+def test_age_group_index_reloads_on_version_gap(age_groups):
+    loader = MagicMock(return_value=age_groups)
+    latest_version = 7
+    version_loader = MagicMock(side_effect=[3, latest_version])
+    index = AgeGroupIndex(loader=loader, ttl_seconds=60, version_loader=version_loader)
+    index.get(0)
+
+    loader.return_value = age_groups[:1]
+    index.apply({'op': 'deleted', 'version': 6, 'id': 'adults'})
+
+    assert index.version == latest_version
+    assert index.get(0) is None
+    assert index.get(30)['id'] == 'adults'
+
+
+def test_age_group_index_checks_version_while_feed_is_attached(age_groups):
+    loader = MagicMock(return_value=age_groups)
+    stored_version = 3
+    version_loader = MagicMock(return_value=stored_version)
+    index = AgeGroupIndex(loader=loader, ttl_seconds=0, version_loader=version_loader)
+    index.get(0)
+    index.attach_feed()
+
+    with patch.object(index, '_refresh_in_background', side_effect=index._background_refresh):
+        index.get(0)
+        loader.assert_called_once()
+
+        loader.reset_mock()
+        version_loader.return_value = stored_version + 1
+        loader.return_value = age_groups[:1]
+        index.get(0)
+
+        loader.assert_called_once()
+        assert index.version == stored_version + 1
+        assert index.get(0) is None
+
+
+@patch('finaluser.services.age_group_events.aws_clients')
+def test_subscriber_applies_events_and_holds_the_index(mock_aws_clients, age_groups):
+    index = AgeGroupIndex(loader=lambda: age_groups, ttl_seconds=0, version_loader=lambda: 1)
+    index.get(0)
+    event = {'op': 'deleted', 'version': 2, 'id': 'seniors'}
+    sqs = mock_aws_clients.long_poll_sqs.return_value
+    sqs.receive_message.return_value = {
+        'Messages': [
+            {'Body': json.dumps(event), 'ReceiptHandle': 'first'},
+            {'Body': 'not json', 'ReceiptHandle': 'second'},
+        ]
+    }
+    subscriber = AgeGroupEventSubscriber(index, 'events', wait_seconds=0, retry_seconds=0)
+
+    handled = subscriber.poll()
+
+    assert handled == len(sqs.receive_message.return_value['Messages'])
+    assert not index.loaded
+    mock_aws_clients.long_poll_sqs.assert_called_once_with(0)
+    entries = sqs.delete_message_batch.call_args.kwargs['Entries']
+    assert [entry['ReceiptHandle'] for entry in entries] == ['first', 'second']
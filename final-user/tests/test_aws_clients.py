@@ -0,0 +1,58 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from finaluser.aws.clients import AWSClients
+
+
+@patch('finaluser.aws.clients.boto3')
+def test_clients_are_built_once(mock_boto3):
+    clients = AWSClients()
+
+    assert clients.sqs is clients.sqs
+    assert clients.dynamodb is clients.dynamodb
+    assert clients.table('Enrollments') is clients.table('Enrollments')
+    mock_boto3.client.assert_called_once()
+    mock_boto3.resource.assert_called_once()
+
+
+def test_dynamodb_resources_are_per_thread_over_one_client():
+    clients = AWSClients()
+    seen = {}
+
+    def use_clients():
+        seen['thread'] = (clients.dynamodb, clients.table('Enrollments'))
+
+    thread = threading.Thread(target=use_clients)
+    thread.start()
+    thread.join()
+
+    assert seen['thread'][0] is not clients.dynamodb
+    assert seen['thread'][1] is not clients.table('Enrollments')
+    assert seen['thread'][0].meta.client is clients.dynamodb.meta.client
+
+    with patch.object(clients.dynamodb.meta.client, 'close') as mock_close:
+        clients.close()
+    mock_close.assert_called_once()
+
+
+@patch('finaluser.aws.clients.boto3')
+def test_queue_url_is_memoized(mock_boto3):
+    mock_sqs = MagicMock()
+    mock_sqs.get_queue_url.return_value = {'QueueUrl': 'http://localhost:4566/000000000000/q'}
+    mock_boto3.client.return_value = mock_sqs
+    clients = AWSClients()
+
+    assert clients.queue_url == clients.queue_url == 'http://localhost:4566/000000000000/q'
+    mock_sqs.get_queue_url.assert_called_once()
+
+
+@patch('finaluser.aws.clients.boto3')
+def test_long_poll_sqs_outlasts_the_wait(mock_boto3):
+    clients = AWSClients()
+    wait_seconds = 20
+
+    assert clients.long_poll_sqs(wait_seconds) is clients.long_poll_sqs(wait_seconds)
+
+    config = mock_boto3.client.call_args.kwargs['config']
+    assert config.read_timeout > wait_seconds
+    mock_boto3.client.assert_called_once()
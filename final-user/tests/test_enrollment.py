@@ -1,5 +1,10 @@
+import asyncio
+import json
+import time
+from concurrent.futures import Future
+from decimal import Decimal
 from http import HTTPStatus
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -8,7 +13,12 @@ from finaluser.schemas.enrollment import (
     EnrollmentOut,
     EnrollmentStatus,
 )
-from finaluser.services.enrollment import EnrollmentService, EnrollmentSQSError
+from finaluser.services.enrollment import (
+    EnrollmentService,
+    EnrollmentSQSError,
+    enrollment_cache,
+)
+from finaluser.services.idempotency import IdempotencyService, idempotency_cache
 
 
 def mock_common_behavior(
@@ -40,7 +50,10 @@ def assert_enrollment_response(response, expected_status, expected_group_id, exp
     assert data['data']['age_group_id'] == expected_group_id
 
 
-@patch('finaluser.services.enrollment.EnrollmentService.publish_enrollment_message')
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.publish_enrollment_message_async',
+    new_callable=AsyncMock,
+)
 @patch('finaluser.repositories.age_group.AgeGroupRepository.get_by_age')
 @patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_cpf')
 def test_create_enrollment(
@@ -69,7 +82,10 @@ def test_create_enrollment(
     )
 
 
-@patch('finaluser.services.enrollment.EnrollmentService.publish_enrollment_message')
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.publish_enrollment_message_async',
+    new_callable=AsyncMock,
+)
 @patch('finaluser.repositories.age_group.AgeGroupRepository.get_by_age')
 @patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_cpf')
 def test_reprocess_rejected_enrollment_when_age_group_now_exists(
@@ -132,7 +148,10 @@ def test_enrollment_already_approved(
     assert body['message'] == 'enrollment already approved'
 
 
-@patch('finaluser.services.enrollment.EnrollmentService.publish_enrollment_message')
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.publish_enrollment_message_async',
+    new_callable=AsyncMock,
+)
 @patch('finaluser.repositories.age_group.AgeGroupRepository.get_by_age')
 @patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_cpf')
 def test_create_enrollment_rejected_due_to_missing_age_group(
@@ -190,6 +209,37 @@ def test_create_enrollment_with_missing_age_group(
     assert result.status == EnrollmentStatus.rejected
 
 
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.publish_enrollment_message_async',
+    new_callable=AsyncMock,
+)
+@patch('finaluser.services.enrollment.EnrollmentService.publish_enrollment_message')
+@patch('finaluser.repositories.age_group.AgeGroupRepository.get_by_age')
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_cpf')
+def test_create_enrollment_async_matches_sync(
+    mock_get_by_cpf,
+    mock_get_by_age,
+    mock_publish_sqs,
+    mock_publish_sqs_async,
+    enrollment_data,
+):
+    mock_common_behavior(mock_get_by_cpf, mock_get_by_age, mock_publish_sqs, enrollment_data)
+    service = EnrollmentService()
+    enrollment_input = EnrollmentIn(
+        name=enrollment_data['name'],
+        cpf=enrollment_data['cpf'],
+        age=enrollment_data['age'],
+    )
+
+    sync_result = service.create_enrollment(enrollment_input)
+    async_result = asyncio.run(service.create_enrollment_async(enrollment_input))
+
+    assert sync_result.model_dump(exclude={'id'}) == async_result.model_dump(exclude={'id'})
+    assert async_result.status == EnrollmentStatus.pending
+    mock_publish_sqs.assert_called_once()
+    mock_publish_sqs_async.assert_awaited_once()
+
+
 @patch('finaluser.services.enrollment.get_sqs_client')
 @patch('finaluser.services.enrollment.get_queue_url')
 def test_publish_enrollment_message_success(
@@ -201,9 +251,9 @@ def test_publish_enrollment_message_success(
     mock_get_queue_url.return_value = mock_queue_url
 
     mock_sqs = MagicMock()
-    mock_sqs.send_message.return_value = {
+    mock_sqs.send_message_batch.return_value = {
         'ResponseMetadata': {'HTTPStatusCode': 200},
-        'MessageId': '12345678Sqs',
+        'Successful': [{'Id': '0', 'MessageId': '12345678Sqs'}],
     }
     mock_get_sqs_client.return_value = mock_sqs
 
@@ -211,8 +261,26 @@ def test_publish_enrollment_message_success(
 
     response = EnrollmentService.publish_enrollment_message(enrollment)
 
-    mock_sqs.send_message.assert_called_once()
-    assert response['ResponseMetadata']['HTTPStatusCode'] == HTTPStatus.OK
+    mock_sqs.send_message_batch.assert_called_once()
+    assert response['MessageId'] == '12345678Sqs'
+
+
+def test_encode_enrollment_message_is_compact_and_versioned(enrollment_data):
+    enrollment = EnrollmentOut(**enrollment_data)
+
+    body, attributes = EnrollmentService.encode_enrollment_message(enrollment)
+
+    assert json.loads(body) == {
+        'i': enrollment.id,
+        'n': enrollment.name,
+        'c': enrollment.cpf,
+        'a': enrollment.age,
+        's': EnrollmentStatus(enrollment.status).value,
+        'g': enrollment.age_group_id,
+    }
+    assert ' ' not in body.replace(enrollment.name, '')
+    assert attributes['schema_version']['StringValue'] == '2'
+    assert attributes['has_age_group']['StringValue'] == 'true'
 
 
 @patch('finaluser.services.enrollment.get_sqs_client')
@@ -226,7 +294,7 @@ def test_publish_enrollment_message_failure(
     mock_get_queue_url.return_value = mock_queue_url
 
     mock_sqs = MagicMock()
-    mock_sqs.send_message.side_effect = Exception('SQS failure')
+    mock_sqs.send_message_batch.side_effect = Exception('SQS failure')
     mock_get_sqs_client.return_value = mock_sqs
 
     enrollment = EnrollmentOut(**enrollment_data)
@@ -249,3 +317,186 @@ def test_get_enrollment(
     data = response.json()
     assert data['cpf'] == enrollment_data['cpf']
     assert data['age_group_id'] == enrollment_data['age_group_id']
+
+
+@patch('finaluser.services.enrollment.EnrollmentService.submit_enrollment_message')
+@patch('finaluser.repositories.age_group.AgeGroupRepository.get_by_age')
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_cpf')
+def test_create_enrollments_bulk(
+    mock_get_by_cpf,
+    mock_get_by_age,
+    mock_submit_sqs,
+    client,
+    enrollment_data,
+):
+    approved_cpf = '987.654.321-00'
+    mock_get_by_cpf.side_effect = lambda cpf: (
+        {**enrollment_data, 'cpf': cpf, 'status': EnrollmentStatus.approved}
+        if cpf == approved_cpf
+        else None
+    )
+    mock_get_by_age.return_value = {'id': enrollment_data['age_group_id']}
+    published = Future()
+    published.set_result({'Id': '0', 'MessageId': '12345678Sqs'})
+    mock_submit_sqs.return_value = published
+
+    payload = [
+        {'name': enrollment_data['name'], 'cpf': enrollment_data['cpf'], 'age': 20},
+        {'name': enrollment_data['name'], 'cpf': approved_cpf, 'age': 20},
+        {'name': enrollment_data['name'], 'cpf': enrollment_data['cpf'], 'age': 20},
+    ]
+    response = client.post('/api/v1/enrollments/bulk', json=payload)
+
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()['results']
+    assert [result['status_code'] for result in results] == [201, 200, 201]
+    assert results[0]['data']['id'] == results[2]['data']['id']
+    assert mock_get_by_cpf.call_count == len({item['cpf'] for item in payload})
+    mock_submit_sqs.assert_called_once()
+
+
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_id')
+def test_get_enrollment_caches_by_status(
+    mock_get_by_id,
+    client,
+    enrollment_data,
+):
+    approved = EnrollmentOut(**{**enrollment_data, 'status': EnrollmentStatus.approved})
+    mock_get_by_id.side_effect = lambda enrollment_id: (
+        approved if enrollment_id == approved.id else None
+    )
+
+    enrollment_ids = [approved.id, 'missing']
+    for _ in range(3):
+        assert client.get(f'/api/v1/enrollments/{approved.id}').status_code == HTTPStatus.OK
+        assert client.get('/api/v1/enrollments/missing').status_code == HTTPStatus.NOT_FOUND
+
+    assert mock_get_by_id.call_count == len(enrollment_ids)
+    assert enrollment_cache.stats() == {'size': 2, 'hits': 4, 'misses': 2}
+
+    EnrollmentService.invalidate_enrollment(approved.id)
+    client.get(f'/api/v1/enrollments/{approved.id}')
+    assert mock_get_by_id.call_count == len(enrollment_ids) + 1
+
+
+@patch('finaluser.services.enrollment.EnrollmentService.publish_enrollment_message_async')
+@patch('finaluser.repositories.age_group.AgeGroupRepository.get_by_age')
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_cpf')
+def test_concurrent_enrollments_for_same_cpf_are_coalesced(
+    mock_get_by_cpf,
+    mock_get_by_age,
+    mock_publish_sqs_async,
+    enrollment_data,
+):
+    async def slow_publish(enrollment):
+        await asyncio.sleep(0.05)
+
+    mock_get_by_cpf.return_value = None
+    mock_get_by_age.return_value = {'id': enrollment_data['age_group_id']}
+    mock_publish_sqs_async.side_effect = slow_publish
+    enrollment_input = EnrollmentIn(
+        name=enrollment_data['name'],
+        cpf=enrollment_data['cpf'],
+        age=enrollment_data['age'],
+    )
+
+    async def submit_twice():
+        service = EnrollmentService()
+        return await asyncio.gather(
+            service.create_enrollment_async(enrollment_input),
+            service.create_enrollment_async(enrollment_input),
+        )
+
+    first, second = asyncio.run(submit_twice())
+
+    assert first is second
+    mock_get_by_cpf.assert_called_once()
+    mock_publish_sqs_async.assert_awaited_once()
+
+
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.publish_enrollment_message_async',
+    new_callable=AsyncMock,
+)
+@patch('finaluser.repositories.age_group.AgeGroupRepository.get_by_age')
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_cpf')
+def test_create_enrollment_replays_idempotent_response(
+    mock_get_by_cpf,
+    mock_get_age_group,
+    mock_publish_sqs,
+    client,
+    enrollment_data,
+):
+    mock_common_behavior(mock_get_by_cpf, mock_get_age_group, mock_publish_sqs, enrollment_data)
+    payload = {
+        'name': enrollment_data['name'],
+        'cpf': enrollment_data['cpf'],
+        'age': enrollment_data['age'],
+    }
+    headers = {'Idempotency-Key': 'retry-me'}
+
+    first = client.post('/api/v1/enrollments/', json=payload, headers=headers)
+    retry = client.post('/api/v1/enrollments/', json=payload, headers=headers)
+    reused = client.post('/api/v1/enrollments/', json={**payload, 'age': 30}, headers=headers)
+
+    assert retry.status_code == first.status_code == HTTPStatus.CREATED
+    assert retry.json() == first.json()
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert reused.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    mock_get_by_cpf.assert_called_once()
+    mock_publish_sqs.assert_awaited_once()
+
+
+def test_idempotency_cache_keeps_the_stored_expiry():
+    remaining_seconds = 5
+    service = IdempotencyService()
+    service.repository = MagicMock()
+    service.repository.get.return_value = {
+        'fingerprint': 'fingerprint',
+        'status_code': Decimal(HTTPStatus.CREATED),
+        'content': '{}',
+        'expires_at': Decimal(int(time.time()) + remaining_seconds),
+    }
+
+    with patch.object(idempotency_cache, 'set') as mock_set:
+        record = asyncio.run(service.get_response_async('retry-me', 'fingerprint'))
+
+    assert record['status_code'] == HTTPStatus.CREATED
+    assert 0 < mock_set.call_args.args[2] <= remaining_seconds
+
+
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_many')
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_id')
+def test_wait_enrollment_returns_when_terminal(
+    mock_get_by_id,
+    mock_get_many,
+    client,
+    enrollment_data,
+):
+    pending = EnrollmentOut(**enrollment_data)
+    approved = EnrollmentOut(**{**enrollment_data, 'status': EnrollmentStatus.approved})
+    mock_get_by_id.return_value = pending
+    mock_get_many.return_value = {approved.id: approved}
+
+    response = client.get(f'/api/v1/enrollments/{approved.id}/wait?timeout=5')
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['status'] == EnrollmentStatus.approved
+
+    events = client.get(f'/api/v1/enrollments/{approved.id}/events?timeout=5').text
+    assert '"status":"approved"' in events
+    assert events.endswith('event: end\ndata: {}\n\n')
+
+
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_many')
+@patch('finaluser.repositories.enrollment.EnrollmentRepository.get_by_id')
+def test_wait_enrollment_not_found_after_timeout(
+    mock_get_by_id,
+    mock_get_many,
+    client,
+):
+    mock_get_by_id.return_value = None
+    mock_get_many.return_value = {}
+
+    response = client.get('/api/v1/enrollments/missing/wait?timeout=0.2')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
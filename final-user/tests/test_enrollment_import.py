@@ -0,0 +1,99 @@
+import asyncio
+import json
+from http import HTTPStatus
+from unittest.mock import AsyncMock, patch
+
+from finaluser.config import settings
+from finaluser.importer import run_import
+from finaluser.schemas.enrollment import EnrollmentOut
+from finaluser.services.enrollment_import import iter_lines
+
+
+def read_events(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.create_enrollment_async',
+    new_callable=AsyncMock,
+)
+def test_import_ndjson_reports_errors_and_summary(mock_create, client, enrollment_data):
+    mock_create.return_value = EnrollmentOut(**enrollment_data)
+    row = {'name': enrollment_data['name'], 'cpf': enrollment_data['cpf'], 'age': 20}
+    body = '\n'.join([json.dumps(row), '{not json', json.dumps({**row, 'cpf': '123'}), ''])
+
+    response = client.post('/api/v1/enrollments/import', content=body.encode())
+
+    assert response.status_code == HTTPStatus.OK
+    events = read_events(response)
+    assert [event['line'] for event in events if event['event'] == 'error'] == [2, 3]
+    assert events[-1] == {'event': 'summary', 'processed': 3, 'invalid': 2, 'pending': 1}
+    mock_create.assert_awaited_once()
+
+
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.create_enrollment_async',
+    new_callable=AsyncMock,
+)
+def test_import_csv(mock_create, client, enrollment_data):
+    mock_create.return_value = EnrollmentOut(**enrollment_data)
+    body = 'name,cpf,age\r\nTestando,123.456.789-00,20\r\nOutro nome,987.654.321-00,30\r\n'
+
+    response = client.post('/api/v1/enrollments/import?format=csv', content=body.encode())
+
+    assert read_events(response)[-1] == {'event': 'summary', 'processed': 2, 'pending': 2}
+    assert mock_create.await_count == len(body.splitlines()) - 1
+
+
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.create_enrollment_async',
+    new_callable=AsyncMock,
+)
+def test_import_reports_undecodable_and_oversized_lines(mock_create, client, enrollment_data):
+    mock_create.return_value = EnrollmentOut(**enrollment_data)
+    row = json.dumps({'name': enrollment_data['name'], 'cpf': enrollment_data['cpf'], 'age': 20})
+    body = b'\n'.join([
+        row.encode(),
+        b'{"name": "\xff"}',
+        b'x' * (settings.IMPORT_MAX_LINE_BYTES * 3),
+        row.encode(),
+    ])
+
+    response = client.post('/api/v1/enrollments/import', content=body)
+
+    events = read_events(response)
+    errors = [event for event in events if event['event'] == 'error']
+    assert [event['line'] for event in errors] == [2, 3]
+    assert 'utf-8' in errors[0]['detail']
+    assert events[-1] == {'event': 'summary', 'processed': 4, 'invalid': 2, 'pending': 2}
+
+
+def test_iter_lines_bounds_lines_without_newline():
+    async def chunks():
+        yield b'first\r\n' + b'x' * 6
+        for _ in range(100):
+            yield b'x' * 6
+        yield b'x\nlast'
+
+    async def collect():
+        return [line async for line in iter_lines(chunks(), max_line_bytes=8)]
+
+    assert asyncio.run(collect()) == [b'first', b'x' * 9, b'last']
+
+
+@patch(
+    'finaluser.services.enrollment.EnrollmentService.create_enrollment_async',
+    new_callable=AsyncMock,
+)
+def test_run_import_reads_the_file_as_bytes(mock_create, tmp_path, capsys, enrollment_data):
+    mock_create.return_value = EnrollmentOut(**enrollment_data)
+    row = {'name': enrollment_data['name'], 'cpf': enrollment_data['cpf'], 'age': 20}
+    path = tmp_path / 'enrollments.ndjson'
+    path.write_bytes(b'\r\n'.join([json.dumps(row).encode(), b'{"name": "\xff"}', b'']))
+
+    failed = asyncio.run(run_import(str(path), 'ndjson'))
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert failed == 1
+    assert events[-1] == {'event': 'summary', 'processed': 2, 'invalid': 1, 'pending': 1}
+    mock_create.assert_awaited_once()
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from finaluser.aws.sqs_publisher import SQSBatchPublisher
+from finaluser.exceptions import EnrollmentSQSError
+
+
+def send_message_batch(QueueUrl, Entries):  # noqa: N803
+    return {
+        'Successful': [{'Id': e['Id'], 'MessageId': e['MessageBody']} for e in Entries[1:]],
+        'Failed': [{'Id': Entries[0]['Id'], 'Code': 'InternalError', 'SenderFault': False}],
+    }
+
+
+@pytest.fixture
+def sqs():
+    mock_sqs = MagicMock()
+    mock_sqs.send_message_batch.side_effect = send_message_batch
+    return mock_sqs
+
+
+@pytest.fixture
+def publisher(sqs):
+    executor = ThreadPoolExecutor(max_workers=2)
+    publisher = SQSBatchPublisher(
+        client_factory=lambda: sqs,
+        queue_url_factory=lambda: 'http://localhost:4566/000000000000/q',
+        executor_factory=lambda: executor,
+        max_linger_ms=200,
+    )
+    yield publisher
+    publisher.close()
+    executor.shutdown()
+
+
+def test_publisher_batches_and_resolves_each_entry(publisher, sqs):
+    futures = [publisher.submit(f'message-{n}') for n in range(12)]
+
+    assert futures[1].result(timeout=5)['MessageId'] == 'message-1'
+    assert futures[11].result(timeout=5)['MessageId'] == 'message-11'
+    assert isinstance(futures[0].exception(timeout=5), EnrollmentSQSError)
+    assert isinstance(futures[10].exception(timeout=5), EnrollmentSQSError)
+
+    batch_sizes = [len(c.kwargs['Entries']) for c in sqs.send_message_batch.call_args_list]
+    assert batch_sizes == [10, 2]
+
+
+def test_publisher_rejects_oversized_message(publisher, sqs):
+    future = publisher.submit('x' * (256 * 1024 + 1))
+
+    with pytest.raises(EnrollmentSQSError):
+        future.result(timeout=1)
+    sqs.send_message_batch.assert_not_called()
@@ -1,27 +1,22 @@
-import boto3
-import json
-import os
-import logging
-from botocore.exceptions import BotoCoreError, ClientError
+import time
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger()
+INIT_STARTED = time.perf_counter()
 
-sqs = boto3.client(
-    "sqs",
-    endpoint_url=os.getenv("AWS_ENDPOINT_URL"),
-    region_name=os.getenv("AWS_DEFAULT_REGION"),
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
-)
+import json  # noqa: E402
+import os  # noqa: E402
+import logging  # noqa: E402
+import random  # noqa: E402
+import threading  # noqa: E402
+from collections import Counter  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
 
-dynamodb = boto3.resource(
-    "dynamodb",
-    endpoint_url=os.getenv("AWS_ENDPOINT_URL"),
-    region_name=os.getenv("AWS_DEFAULT_REGION"),
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
-)
+import boto3  # noqa: E402
+from boto3.dynamodb.types import TypeSerializer  # noqa: E402
+from botocore.config import Config  # noqa: E402
+from botocore.exceptions import BotoCoreError, ClientError  # noqa: E402
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
 QUEUE_URL = os.getenv("SQS_ENROLLMENT_QUEUE_URL")
 TABLE_NAME = os.getenv("DB_ENROLLMENTS_TABLE_NAME")
@@ -30,79 +25,286 @@ if not TABLE_NAME:
     logger.error("Environment variable DB_ENROLLMENTS_TABLE_NAME not defined!")
     raise ValueError("TABLE_NAME not configured")
 
-table = dynamodb.Table(TABLE_NAME)
+WRITE_CONCURRENCY = int(os.getenv("DYNAMODB_WRITE_CONCURRENCY", "10"))
+MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+
+_clients = {}
+_clients_lock = threading.Lock()
+_executor = None
+serializer = TypeSerializer()
+
+
+def get_client(service_name):
+    """Create boto3 clients on first use so cold starts only pay for what they need."""
+    client = _clients.get(service_name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(service_name)
+            if client is None:
+                started = time.perf_counter()
+                config = Config(max_pool_connections=MAX_POOL_CONNECTIONS)
+                if service_name == "dynamodb":
+                    # write_item retries with jitter and within the Lambda deadline;
+                    # botocore's own retries would run underneath it, unbounded by it.
+                    config = config.merge(Config(retries={"total_max_attempts": 1}))
+                client = _clients[service_name] = boto3.client(
+                    service_name,
+                    endpoint_url=os.getenv("AWS_ENDPOINT_URL"),
+                    region_name=os.getenv("AWS_DEFAULT_REGION"),
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
+                    config=config,
+                )
+                logger.info(f"{service_name} client created in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return client
+
+
+def get_executor():
+    """Shared, bounded pool for DynamoDB writes, created on first use."""
+    global _executor
+    if _executor is None:
+        with _clients_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=WRITE_CONCURRENCY, thread_name_prefix="dynamodb-writer"
+                )
+    return _executor
+
+
+def serialize(values):
+    return {key: serializer.serialize(value) for key, value in values.items()}
+
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("DYNAMODB_RETRY_MAX_ATTEMPTS", "8"))
+RETRY_BASE_DELAY_MS = int(os.getenv("DYNAMODB_RETRY_BASE_DELAY_MS", "50"))
+RETRY_MAX_DELAY_MS = int(os.getenv("DYNAMODB_RETRY_MAX_DELAY_MS", "2000"))
+DEADLINE_SAFETY_MS = int(os.getenv("LAMBDA_DEADLINE_SAFETY_MS", "1000"))
+COALESCE_BY_CPF = os.getenv("COALESCE_BY_CPF", "false").lower() == "true"
+STATUS_RANK = {"pending": 0, "rejected": 1, "approved": 2}
+RETRYABLE_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "InternalServerError",
+    "ServiceUnavailable",
+}
+
+
+MESSAGE_SCHEMA_VERSION = "2"
+MESSAGE_KEYS = (
+    ("i", "id"),
+    ("n", "name"),
+    ("c", "cpf"),
+    ("a", "age"),
+    ("s", "status"),
+)
+
+
+def schema_version(message):
+    attribute = message.get("messageAttributes", {}).get("schema_version") or {}
+    return attribute.get("stringValue") or "1"
+
+
+def parse_message(message):
+    """Decode a message body into an enrollment item.
+
+    v2 bodies use compact keys (see ``MESSAGE_KEYS``); anything without a
+    ``schema_version`` attribute is read as the original v1 JSON.
+    """
+    body = json.loads(message["body"])
+    if schema_version(message) == MESSAGE_SCHEMA_VERSION:
+        item = {field: body[key] for key, field in MESSAGE_KEYS}
+        item["age_group_id"] = body.get("g", "")
+    else:
+        item = {
+            "id": body["id"],
+            "name": body["name"],
+            "cpf": body["cpf"],
+            "age": body["age"],
+            "status": body["status"],
+            "age_group_id": body["age_group_id"]
+        }
+
+    if item["status"] in ["pending", "rejected"] and item["age_group_id"]:
+        item["status"] = "approved"
+
+    return item
+
+
+def coalesce(items_by_message, sent_at):
+    """Keep one item per enrollment (per CPF when COALESCE_BY_CPF is set).
+
+    The most advanced status wins; between equal statuses the most recently sent
+    message wins. Returns the winning items keyed by message ID.
+    """
+    winners = {}
+    for message_id, item in items_by_message.items():
+        key = "".join(filter(str.isdigit, item["cpf"])) if COALESCE_BY_CPF else item["id"]
+        rank = (STATUS_RANK.get(item["status"], 0), sent_at[message_id])
+        if key not in winners or rank >= winners[key][0]:
+            winners[key] = (rank, message_id, item)
+
+    return {message_id: item for _, message_id, item in winners.values()}
 
-MAX_RETRIES = 3
 
-def process_batch(messages):
-    items = []
-    message_entries = []
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff, in seconds."""
+    ceiling = min(RETRY_MAX_DELAY_MS, RETRY_BASE_DELAY_MS * (2 ** attempt))
+    return random.uniform(0, ceiling) / 1000
 
-    for message in messages:
+
+def has_time_for(delay, remaining_ms):
+    if remaining_ms is None:
+        return True
+    return remaining_ms() - delay * 1000 > DEADLINE_SAFETY_MS
+
+
+def write_condition(item):
+    """Only create the record or advance its status; equal or older statuses are skipped."""
+    rank = STATUS_RANK.get(item["status"], 0)
+    older = [status for status, status_rank in STATUS_RANK.items() if status_rank < rank]
+    if not older:
+        return {
+            "ConditionExpression": "attribute_not_exists(#id)",
+            "ExpressionAttributeNames": {"#id": "id"},
+        }
+
+    placeholders = {f":older{index}": status for index, status in enumerate(older)}
+    return {
+        "ConditionExpression": f"attribute_not_exists(#id) OR #status IN ({', '.join(placeholders)})",
+        "ExpressionAttributeNames": {"#id": "id", "#status": "status"},
+        "ExpressionAttributeValues": serialize(placeholders),
+    }
+
+
+def write_item(item, remaining_ms, stats):
+    """Conditionally put one item and return whether it is stored (or already up to date)."""
+    condition = write_condition(item)
+    attempt = 0
+
+    while True:
         try:
-            body = json.loads(message["body"])
-            item = {
-                "id": body["id"],
-                "name": body["name"],
-                "cpf": body["cpf"],
-                "age": body["age"],
-                "status": body["status"],
-                "age_group_id": body["age_group_id"]
-            }
-
-            if body["status"] in ["pending", "rejected"] and body.get("age_group_id"):
-                item["status"] = "approved"
-
-            items.append(item)
-            message_entries.append({
-                "Id": message["messageId"],
-                "ReceiptHandle": message["receiptHandle"]
-            })
-        except KeyError as e:
-            logger.error(f"Error in message fields {message.get('messageId', 'unknown')}: {str(e)}")
+            get_client("dynamodb").put_item(TableName=TABLE_NAME, Item=serialize(item), **condition)
+            stats["written"] += 1
+            return True
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code == "ConditionalCheckFailedException":
+                stats["skipped"] += 1
+                return True
+            if code not in RETRYABLE_ERRORS:
+                logger.error(f"Error inserting item {item['id']} into DynamoDB: {str(e)}")
+                return False
+            stats["throttled"] += 1
+        except BotoCoreError as e:
+            logger.error(f"Error inserting item {item['id']} into DynamoDB: {str(e)}")
+            return False
+
+        attempt += 1
+        delay = backoff_delay(attempt)
+        if attempt >= RETRY_MAX_ATTEMPTS or not has_time_for(delay, remaining_ms):
+            stats["gave_up"] += 1
+            logger.warning(f"Giving up on item {item['id']} after {attempt} attempts.")
+            return False
+
+        stats["retries"] += 1
+        time.sleep(delay)
+
+
+def write_items(items_by_message, remaining_ms=None):
+    """Write items with conditional puts and return the message IDs that were not written.
+
+    Puts run concurrently on a pool of at most DYNAMODB_WRITE_CONCURRENCY threads,
+    so a large batch costs roughly one round trip per pool slot instead of one
+    per item. Throttled writes are retried with exponential backoff and jitter,
+    as long as the Lambda has time left before its deadline. Stale or identical
+    items fail the condition and are counted as skipped.
+    """
+    def write(entry):
+        item_stats = Counter()
+        message_id, item = entry
+        return message_id, write_item(item, remaining_ms, item_stats), item_stats
+
+    entries = list(items_by_message.items())
+    results = get_executor().map(write, entries) if len(entries) > 1 else map(write, entries)
+
+    failed = []
+    stats = Counter()
+    for message_id, written, item_stats in results:
+        stats.update(item_stats)
+        if not written:
+            failed.append(message_id)
+
+    logger.info(f"DynamoDB write stats: {json.dumps(stats)}")
+    return failed
+
+
+def process_batch(messages, remaining_ms=None):
+    """Persist the batch and return the IDs of the messages that must be retried.
+
+    Malformed messages are returned as failures too, so that after
+    DLQ_MAX_RECEIVE_COUNT receives SQS moves them to the dead-letter queue.
+    """
+    items_by_message = {}
+    receipt_handles = {}
+    sent_at = {}
+    malformed = []
+
+    for position, message in enumerate(messages):
+        message_id = message["messageId"]
+        try:
+            item = parse_message(message)
+            receipt_handle = message["receiptHandle"]
+            sent = int(message.get("attributes", {}).get("SentTimestamp", 0))
         except json.JSONDecodeError as e:
-            logger.error(f"Error decoding JSON in message {message.get('messageId', 'unknown')}: {str(e)}")
+            logger.error(f"Error decoding JSON in message {message_id}: {str(e)}")
+            malformed.append(message_id)
+            continue
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Error in message fields {message_id}: {e!r}")
+            malformed.append(message_id)
+            continue
+
+        items_by_message[message_id] = item
+        receipt_handles[message_id] = receipt_handle
+        sent_at[message_id] = (sent, position)
 
-    if not items:
+    if not items_by_message:
         logger.warning("No valid items to process.")
-        return False
+        return malformed
 
-    try:
-        with table.batch_writer() as batch:
-            for item in items:
-                batch.put_item(Item=item)
-        logger.info(f"{len(items)} enrollments processed successfully!")
-    except (BotoCoreError, ClientError) as e:
-        logger.error(f"Error inserting batch into DynamoDB: {str(e)}")
-        raise
+    items_to_write = coalesce(items_by_message, sent_at)
+    duplicates = len(items_by_message) - len(items_to_write)
+    if duplicates:
+        logger.info(f"{duplicates} duplicate messages coalesced in batch.")
 
+    failed = write_items(items_to_write, remaining_ms)
+    written = len(items_to_write) - len(failed)
+    logger.info(f"{written} enrollments processed successfully, {len(failed)} failed.")
+
+    message_entries = [
+        {"Id": message_id, "ReceiptHandle": receipt_handle}
+        for message_id, receipt_handle in receipt_handles.items()
+        if message_id not in failed
+    ]
     if QUEUE_URL and message_entries:
         try:
-            sqs.delete_message_batch(QueueUrl=QUEUE_URL, Entries=message_entries)
+            get_client("sqs").delete_message_batch(QueueUrl=QUEUE_URL, Entries=message_entries)
             logger.info(f"{len(message_entries)} messages deleted from SQS.")
         except (BotoCoreError, ClientError) as e:
             logger.error(f"Error deleting messages from SQS: {str(e)}")
-            raise
 
-    return True
+    return failed + malformed
+
 
 def lambda_handler(event, context):
     logger.info(f"Receiving {len(event['Records'])} messages from SQS")
 
-    retries = 0
-    while retries < MAX_RETRIES:
-        try:
-            success = process_batch(event["Records"])
-            if success:
-                return {"statusCode": 200, "body": "Messages processed successfully!"}
-            else:
-                logger.warning("No valid messages processed, but no critical error.")
-                return {"statusCode": 200, "body": "No valid messages processed."}
-        except Exception as e:
-            retries += 1
-            logger.warning(f"Attempt {retries}/{MAX_RETRIES} failed: {str(e)}")
-            if retries == MAX_RETRIES:
-                logger.error("Failed to process messages after multiple attempts.")
-                raise
-
-    return {"statusCode": 500, "body": "Error processing messages."}
\ No newline at end of file
+    failed = process_batch(event["Records"], getattr(context, "get_remaining_time_in_millis", None))
+    if failed:
+        logger.warning(f"{len(failed)} messages returned to the queue for retry.")
+
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failed]}
+
+
+logger.info(f"Init completed in {(time.perf_counter() - INIT_STARTED) * 1000:.1f} ms")
@@ -0,0 +1,235 @@
+"""Long-running SQS consumer for environments without Lambda.
+
+Runs several long-polling receive loops that hand batches to a pool of write
+workers, each calling ``consumer_enrollment.process_batch``. Visibility of
+in-flight batches is extended while they are being written, and SIGTERM/SIGINT
+stop the receive loops and drain in-flight batches before exiting.
+
+    python lambda/consumer_worker.py
+"""
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import boto3  # noqa: E402
+from botocore.config import Config  # noqa: E402
+from botocore.exceptions import BotoCoreError, ClientError  # noqa: E402
+
+import consumer_enrollment as consumer  # noqa: E402
+
+logger = logging.getLogger("consumer_worker")
+
+RECEIVE_LOOPS = int(os.getenv("WORKER_RECEIVE_LOOPS", "4"))
+WRITE_THREADS = int(os.getenv("WORKER_WRITE_THREADS", "8"))
+WAIT_TIME_SECONDS = int(os.getenv("WORKER_WAIT_TIME_SECONDS", "20"))
+VISIBILITY_TIMEOUT = int(os.getenv("WORKER_VISIBILITY_TIMEOUT", "30"))
+MAX_MESSAGES = 10
+
+
+def to_record(message):
+    """Convert a ReceiveMessage entry into the record shape Lambda hands to the handler."""
+    return {
+        "messageId": message["MessageId"],
+        "receiptHandle": message["ReceiptHandle"],
+        "body": message["Body"],
+        "attributes": message.get("Attributes", {}),
+        "messageAttributes": {
+            name: {
+                "stringValue": attribute.get("StringValue"),
+                "binaryValue": attribute.get("BinaryValue"),
+                "dataType": attribute["DataType"],
+            }
+            for name, attribute in message.get("MessageAttributes", {}).items()
+        },
+        "eventSource": "aws:sqs",
+    }
+
+
+class VisibilityExtender:
+    """Keeps in-flight batches invisible until their write finishes."""
+
+    def __init__(self, sqs, queue_url, timeout):
+        self.sqs = sqs
+        self.queue_url = queue_url
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._batches = {}
+        self._next_token = 0
+
+    def track(self, records):
+        with self._lock:
+            self._next_token += 1
+            self._batches[self._next_token] = (records, time.monotonic())
+            return self._next_token
+
+    def release(self, token):
+        with self._lock:
+            self._batches.pop(token, None)
+
+    def run(self, stopping):
+        while not stopping.wait(self.timeout / 3):
+            self.extend_due()
+
+    def extend_due(self):
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                (token, records)
+                for token, (records, extended_at) in self._batches.items()
+                if now - extended_at >= self.timeout / 2
+            ]
+            for token, records in due:
+                self._batches[token] = (records, now)
+
+        for _, records in due:
+            try:
+                self.sqs.change_message_visibility_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[
+                        {
+                            "Id": record["messageId"],
+                            "ReceiptHandle": record["receiptHandle"],
+                            "VisibilityTimeout": self.timeout,
+                        }
+                        for record in records
+                    ],
+                )
+            except (BotoCoreError, ClientError) as e:
+                logger.warning(f"Error extending message visibility: {str(e)}")
+
+
+class ConsumerWorker:
+    def __init__(self, queue_url):
+        self.queue_url = queue_url
+        self.sqs = boto3.client(
+            "sqs",
+            endpoint_url=os.getenv("AWS_ENDPOINT_URL"),
+            region_name=os.getenv("AWS_DEFAULT_REGION"),
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
+            config=Config(max_pool_connections=RECEIVE_LOOPS + 2),
+        )
+        self.stopping = threading.Event()
+        self.pool = ThreadPoolExecutor(max_workers=WRITE_THREADS, thread_name_prefix="writer")
+        self.slots = threading.BoundedSemaphore(WRITE_THREADS * 2)
+        self.extender = VisibilityExtender(self.sqs, queue_url, VISIBILITY_TIMEOUT)
+        self.processed = 0
+        self.failed = 0
+        self._stats_lock = threading.Lock()
+
+    def stop(self, *_):
+        if not self.stopping.is_set():
+            logger.info("Shutdown requested, draining in-flight batches...")
+            self.stopping.set()
+
+    def run(self):
+        started = time.monotonic()
+        drained = threading.Event()
+        extender = threading.Thread(target=self.extender.run, args=(drained,), daemon=True)
+        extender.start()
+        loops = [
+            threading.Thread(target=self.receive_loop, name=f"receiver-{index}")
+            for index in range(RECEIVE_LOOPS)
+        ]
+        for loop in loops:
+            loop.start()
+        for loop in loops:
+            loop.join()
+
+        # Keep extending visibility until the last in-flight batch is written.
+        self.pool.shutdown(wait=True)
+        drained.set()
+        extender.join()
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Worker stopped: {self.processed} messages processed, {self.failed} failed "
+            f"in {elapsed:.1f}s ({self.processed / max(elapsed, 1e-9):.1f} msg/s)."
+        )
+
+    def receive_loop(self):
+        while not self.stopping.is_set():
+            if not self.slots.acquire(timeout=1):
+                continue
+
+            try:
+                response = self.sqs.receive_message(
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=MAX_MESSAGES,
+                    WaitTimeSeconds=WAIT_TIME_SECONDS,
+                    VisibilityTimeout=VISIBILITY_TIMEOUT,
+                    AttributeNames=["All"],
+                    MessageAttributeNames=["All"],
+                )
+            except (BotoCoreError, ClientError) as e:
+                self.slots.release()
+                logger.error(f"Error receiving messages from SQS: {str(e)}")
+                self.stopping.wait(1)
+                continue
+
+            messages = response.get("Messages", [])
+            if not messages:
+                self.slots.release()
+                continue
+
+            records = [to_record(message) for message in messages]
+            token = self.extender.track(records)
+            self.pool.submit(self.write_batch, records, token)
+
+    def write_batch(self, records, token):
+        try:
+            failed = consumer.process_batch(records)
+        except Exception as e:
+            logger.error(f"Error processing batch: {str(e)}")
+            failed = [record["messageId"] for record in records]
+        finally:
+            self.extender.release(token)
+            self.slots.release()
+
+        with self._stats_lock:
+            self.processed += len(records) - len(failed)
+            self.failed += len(failed)
+
+
+def resolve_queue_url():
+    queue_url = os.getenv("SQS_ENROLLMENT_QUEUE_URL")
+    if queue_url:
+        return queue_url
+
+    queue_name = os.getenv("SQS_ENROLLMENT_QUEUE_NAME")
+    if not queue_name:
+        raise ValueError("SQS_ENROLLMENT_QUEUE_URL or SQS_ENROLLMENT_QUEUE_NAME not configured")
+
+    sqs = boto3.client(
+        "sqs",
+        endpoint_url=os.getenv("AWS_ENDPOINT_URL"),
+        region_name=os.getenv("AWS_DEFAULT_REGION"),
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
+    )
+    return sqs.get_queue_url(QueueName=queue_name)["QueueUrl"]
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    queue_url = resolve_queue_url()
+    consumer.QUEUE_URL = queue_url
+
+    worker = ConsumerWorker(queue_url)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    logger.info(
+        f"Consuming {queue_url} with {RECEIVE_LOOPS} receive loops and {WRITE_THREADS} writers."
+    )
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
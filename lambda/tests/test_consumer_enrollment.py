@@ -0,0 +1,208 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+import consumer_enrollment
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "PutItem")
+
+
+def make_item(enrollment_id="enrollment-1", status="pending", cpf="123.456.789-00"):
+    return {
+        "id": enrollment_id,
+        "name": "Testando",
+        "cpf": cpf,
+        "age": 20,
+        "status": status,
+        "age_group_id": "" if status == "pending" else "group-1",
+    }
+
+
+def make_message(message_id, item, sent_at=0):
+    return {
+        "messageId": message_id,
+        "receiptHandle": f"handle-{message_id}",
+        "body": json.dumps(item),
+        "attributes": {"SentTimestamp": str(sent_at)},
+    }
+
+
+@pytest.fixture
+def dynamodb():
+    client = MagicMock()
+    with patch.object(consumer_enrollment, "get_client", return_value=client):
+        yield client
+
+
+@pytest.fixture
+def no_sleep():
+    with patch.object(consumer_enrollment.time, "sleep") as sleep:
+        yield sleep
+
+
+def test_write_condition_pending_only_creates():
+    condition = consumer_enrollment.write_condition(make_item(status="pending"))
+
+    assert condition == {
+        "ConditionExpression": "attribute_not_exists(#id)",
+        "ExpressionAttributeNames": {"#id": "id"},
+    }
+
+
+def test_write_condition_approved_advances_older_statuses():
+    condition = consumer_enrollment.write_condition(make_item(status="approved"))
+
+    assert condition["ConditionExpression"] == (
+        "attribute_not_exists(#id) OR #status IN (:older0, :older1)"
+    )
+    assert condition["ExpressionAttributeValues"] == {
+        ":older0": {"S": "pending"},
+        ":older1": {"S": "rejected"},
+    }
+
+
+def test_coalesce_keeps_approved_over_later_pending():
+    items = {
+        "m1": make_item(status="approved"),
+        "m2": make_item(status="pending"),
+    }
+    sent_at = {"m1": (1, 0), "m2": (2, 1)}
+
+    assert consumer_enrollment.coalesce(items, sent_at) == {"m1": items["m1"]}
+
+
+def test_coalesce_keeps_latest_duplicate():
+    items = {
+        "m1": make_item(),
+        "m2": make_item(),
+        "m3": make_item("enrollment-2"),
+    }
+    sent_at = {"m1": (1, 0), "m2": (1, 1), "m3": (1, 2)}
+
+    assert set(consumer_enrollment.coalesce(items, sent_at)) == {"m2", "m3"}
+
+
+def test_write_item_counts_written(dynamodb):
+    stats = consumer_enrollment.Counter()
+
+    assert consumer_enrollment.write_item(make_item(), None, stats)
+    assert stats == {"written": 1}
+    dynamodb.put_item.assert_called_once()
+
+
+def test_write_item_skips_failed_condition(dynamodb):
+    dynamodb.put_item.side_effect = client_error("ConditionalCheckFailedException")
+    stats = consumer_enrollment.Counter()
+
+    assert consumer_enrollment.write_item(make_item(), None, stats)
+    assert stats == {"skipped": 1}
+
+
+def test_write_item_retries_throttled_writes(dynamodb, no_sleep):
+    dynamodb.put_item.side_effect = [client_error("ThrottlingException"), {}]
+    stats = consumer_enrollment.Counter()
+
+    assert consumer_enrollment.write_item(make_item(), None, stats)
+    assert stats == {"throttled": 1, "retries": 1, "written": 1}
+    assert no_sleep.call_count == 1
+
+
+def test_write_item_gives_up_near_the_deadline(dynamodb, no_sleep):
+    dynamodb.put_item.side_effect = client_error("ThrottlingException")
+    remaining_ms = MagicMock(return_value=consumer_enrollment.DEADLINE_SAFETY_MS)
+    stats = consumer_enrollment.Counter()
+
+    assert not consumer_enrollment.write_item(make_item(), remaining_ms, stats)
+    assert stats == {"throttled": 1, "gave_up": 1}
+    no_sleep.assert_not_called()
+
+
+def test_write_item_fails_on_other_errors(dynamodb):
+    dynamodb.put_item.side_effect = client_error("ValidationException")
+    stats = consumer_enrollment.Counter()
+
+    assert not consumer_enrollment.write_item(make_item(), None, stats)
+    assert dynamodb.put_item.call_count == 1
+
+
+def test_lambda_handler_reports_failed_and_malformed_messages(dynamodb):
+    def put_item(Item, **kwargs):
+        if Item["id"] == {"S": "enrollment-2"}:
+            raise client_error("ValidationException")
+
+    dynamodb.put_item.side_effect = put_item
+    records = [
+        make_message("m1", make_item("enrollment-1")),
+        make_message("m2", make_item("enrollment-2")),
+        {"messageId": "m3", "receiptHandle": "handle-m3", "body": "{"},
+    ]
+
+    response = consumer_enrollment.lambda_handler({"Records": records}, None)
+
+    assert response == {
+        "batchItemFailures": [{"itemIdentifier": "m2"}, {"itemIdentifier": "m3"}]
+    }
+
+
+def test_process_batch_writes_duplicates_once(dynamodb):
+    records = [
+        make_message("m1", make_item(status="approved"), sent_at=1),
+        make_message("m2", make_item(status="pending"), sent_at=2),
+    ]
+
+    assert consumer_enrollment.process_batch(records) == []
+    dynamodb.put_item.assert_called_once()
+    assert dynamodb.put_item.call_args.kwargs["Item"]["status"] == {"S": "approved"}
+
+
+@pytest.mark.parametrize("body", ['"x"', "[]", '{"id": "enrollment-1"}', "null"])
+def test_process_batch_reports_invalid_bodies_per_message(dynamodb, body):
+    records = [
+        make_message("m1", make_item()),
+        {"messageId": "m2", "receiptHandle": "handle-m2", "body": body},
+    ]
+
+    assert consumer_enrollment.process_batch(records) == ["m2"]
+    dynamodb.put_item.assert_called_once()
+
+
+def test_rejected_v2_message_without_age_group_round_trips(dynamodb):
+    # finaluser omits "g" from v2 bodies when the enrollment has no age group.
+    body = {
+        "i": "enrollment-1",
+        "n": "Testando",
+        "c": "123.456.789-00",
+        "a": 90,
+        "s": "rejected",
+    }
+    record = {
+        "messageId": "m1",
+        "receiptHandle": "handle-m1",
+        "body": json.dumps(body, separators=(",", ":")),
+        "messageAttributes": {
+            "schema_version": {"stringValue": "2", "dataType": "Number"}
+        },
+    }
+
+    assert consumer_enrollment.process_batch([record]) == []
+    item = dynamodb.put_item.call_args.kwargs["Item"]
+    assert item["age_group_id"] == {"S": ""}
+    assert item["status"] == {"S": "rejected"}
+
+
+def test_dynamodb_client_does_not_retry_on_its_own():
+    with (
+        patch.dict(consumer_enrollment._clients, clear=True),
+        patch.object(consumer_enrollment.boto3, "client") as client,
+    ):
+        consumer_enrollment.get_client("dynamodb")
+        consumer_enrollment.get_client("sqs")
+
+    dynamodb_config = client.call_args_list[0].kwargs["config"]
+    sqs_config = client.call_args_list[1].kwargs["config"]
+    assert dynamodb_config.retries == {"total_max_attempts": 1}
+    assert sqs_config.retries is None
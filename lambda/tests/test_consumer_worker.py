@@ -0,0 +1,106 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import consumer_worker
+
+
+def make_records(*message_ids):
+    return [
+        {"messageId": message_id, "receiptHandle": f"handle-{message_id}"}
+        for message_id in message_ids
+    ]
+
+
+@pytest.fixture
+def worker():
+    with patch.object(consumer_worker.boto3, "client"):
+        worker = consumer_worker.ConsumerWorker("queue-url")
+    yield worker
+    worker.pool.shutdown(wait=True)
+
+
+def test_to_record_uses_lambda_attribute_casing():
+    message = {
+        "MessageId": "m1",
+        "ReceiptHandle": "handle-m1",
+        "Body": "{}",
+        "Attributes": {"SentTimestamp": "1"},
+        "MessageAttributes": {
+            "schema_version": {"StringValue": "2", "DataType": "Number"}
+        },
+    }
+
+    record = consumer_worker.to_record(message)
+
+    assert record["messageId"] == "m1"
+    assert record["receiptHandle"] == "handle-m1"
+    assert record["body"] == "{}"
+    assert record["attributes"] == {"SentTimestamp": "1"}
+    assert record["messageAttributes"] == {
+        "schema_version": {
+            "stringValue": "2",
+            "binaryValue": None,
+            "dataType": "Number",
+        }
+    }
+
+
+def test_extensions_are_due_at_half_the_timeout():
+    sqs = MagicMock()
+    timeout = 30
+    extender = consumer_worker.VisibilityExtender(sqs, "queue-url", timeout)
+
+    with patch.object(consumer_worker.time, "monotonic") as monotonic:
+        monotonic.return_value = 100
+        extender.track(make_records("m1", "m2"))
+
+        monotonic.return_value = 100 + timeout / 2 - 1
+        extender.extend_due()
+        sqs.change_message_visibility_batch.assert_not_called()
+
+        monotonic.return_value = 100 + timeout / 2
+        extender.extend_due()
+        extender.extend_due()
+
+    sqs.change_message_visibility_batch.assert_called_once()
+    entries = sqs.change_message_visibility_batch.call_args.kwargs["Entries"]
+    assert [entry["ReceiptHandle"] for entry in entries] == ["handle-m1", "handle-m2"]
+    assert {entry["VisibilityTimeout"] for entry in entries} == {timeout}
+
+
+def test_batch_is_released_after_its_write(worker):
+    records = make_records("m1", "m2")
+    worker.slots.acquire()
+    token = worker.extender.track(records)
+
+    with patch.object(consumer_worker.consumer, "process_batch", return_value=["m2"]):
+        worker.write_batch(records, token)
+
+    with patch.object(consumer_worker.time, "monotonic", return_value=float("inf")):
+        worker.extender.extend_due()
+    worker.sqs.change_message_visibility_batch.assert_not_called()
+    assert (worker.processed, worker.failed) == (1, 1)
+    for _ in range(consumer_worker.WRITE_THREADS * 2):
+        assert worker.slots.acquire(blocking=False)
+
+
+def test_failed_batch_counts_as_failed(worker):
+    records = make_records("m1", "m2")
+    worker.slots.acquire()
+    token = worker.extender.track(records)
+
+    with patch.object(
+        consumer_worker.consumer, "process_batch", side_effect=RuntimeError
+    ):
+        worker.write_batch(records, token)
+
+    assert (worker.processed, worker.failed) == (0, len(records))
+
+
+def test_run_returns_after_draining_when_stopped(worker):
+    worker.stop()
+
+    worker.run()
+
+    worker.sqs.receive_message.assert_not_called()
@@ -0,0 +1,283 @@
+"""Move enrollment messages from the dead-letter queue back to the main queue.
+
+Several threads receive from the DLQ, keep only the messages matching the
+requested failure reasons, re-send them to the source queue with
+SendMessageBatch and delete them from the DLQ. A shared token bucket caps the
+overall rate. Messages that are not moved (other reasons, or every message in a
+dry run) are received with a visibility timeout that covers the run, counted
+once, and made visible again when it ends.
+
+    python scripts/redrive_dlq.py --reason processing --rate 200
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from dotenv import load_dotenv
+
+REASONS = ("invalid_json", "missing_fields", "processing")
+MAX_BATCH = 10
+REQUIRED_FIELDS = {
+    "1": ("id", "name", "cpf", "age", "status", "age_group_id"),
+    "2": ("i", "n", "c", "a", "s"),
+}
+
+
+def classify(message):
+    """Guess why a message was dead-lettered from its body and schema version."""
+    try:
+        payload = json.loads(message["Body"])
+    except ValueError:
+        return "invalid_json"
+
+    version = message.get("MessageAttributes", {}).get("schema_version", {}).get("StringValue", "1")
+    required = REQUIRED_FIELDS.get(version, REQUIRED_FIELDS["1"])
+    if not isinstance(payload, dict) or any(field not in payload for field in required):
+        return "missing_fields"
+
+    return "processing"
+
+
+class RateLimiter:
+    """Token bucket shared by every redrive thread.
+
+    The bucket holds at least one full SQS batch, so a rate below 10 msg/s still
+    lets a batch through instead of waiting forever.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(rate, MAX_BATCH)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count):
+        if count > self.capacity:
+            raise ValueError(f"cannot acquire {count} tokens from a bucket of {self.capacity}")
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= count:
+                    self.tokens -= count
+                    return
+                wait = (count - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Redrive:
+    def __init__(
+        self, sqs, source_url, target_url, reasons, rate, max_messages, dry_run, visibility_timeout
+    ):
+        self.sqs = sqs
+        self.source_url = source_url
+        self.target_url = target_url
+        self.reasons = set(reasons)
+        self.limiter = RateLimiter(rate)
+        self.max_messages = max_messages
+        self.dry_run = dry_run
+        self.visibility_timeout = visibility_timeout
+        self.seen = set()
+        self.held = {}
+        self.claimed = 0
+        self.lock = threading.Lock()
+        self.counts = {"moved": 0, "skipped": 0, "failed": 0}
+        self.by_reason = {reason: 0 for reason in REASONS}
+
+    def budget_left(self):
+        with self.lock:
+            return self.max_messages is None or self.claimed < self.max_messages
+
+    def claim(self, messages):
+        """Reserve --max-messages budget for ``messages``; the rest stay held in the DLQ."""
+        with self.lock:
+            if self.max_messages is None:
+                allowed = len(messages)
+            else:
+                allowed = max(0, min(len(messages), self.max_messages - self.claimed))
+            self.claimed += allowed
+        for message in messages[allowed:]:
+            self.hold(message)
+        return messages[:allowed]
+
+    def run_thread(self):
+        while self.budget_left():
+            try:
+                response = self.sqs.receive_message(
+                    QueueUrl=self.source_url,
+                    MaxNumberOfMessages=MAX_BATCH,
+                    WaitTimeSeconds=2,
+                    VisibilityTimeout=self.visibility_timeout,
+                    AttributeNames=["All"],
+                    MessageAttributeNames=["All"],
+                )
+            except (BotoCoreError, ClientError) as e:
+                print(f"❌ Falha ao ler a DLQ: {e}")
+                return
+
+            messages = response.get("Messages", [])
+            if not messages:
+                return
+
+            selected = []
+            fresh = 0
+            for message in messages:
+                with self.lock:
+                    if message["MessageId"] in self.seen:
+                        # Reappeared after the visibility timeout: already counted.
+                        self.held[message["MessageId"]] = message["ReceiptHandle"]
+                        continue
+                    self.seen.add(message["MessageId"])
+                fresh += 1
+
+                reason = classify(message)
+                with self.lock:
+                    self.by_reason[reason] += 1
+                if reason in self.reasons:
+                    selected.append(message)
+                else:
+                    self.hold(message)
+                    with self.lock:
+                        self.counts["skipped"] += 1
+
+            selected = self.claim(selected)
+            if selected:
+                self.move(selected)
+            if not fresh:
+                return
+
+    def hold(self, message):
+        with self.lock:
+            self.held[message["MessageId"]] = message["ReceiptHandle"]
+
+    def release(self):
+        """Make the messages left in the DLQ visible again."""
+        held = list(self.held.items())
+        for start in range(0, len(held), MAX_BATCH):
+            entries = [
+                {"Id": message_id, "ReceiptHandle": receipt_handle, "VisibilityTimeout": 0}
+                for message_id, receipt_handle in held[start:start + MAX_BATCH]
+            ]
+            try:
+                self.sqs.change_message_visibility_batch(QueueUrl=self.source_url, Entries=entries)
+            except (BotoCoreError, ClientError) as e:
+                print(f"⚠️  Falha ao liberar mensagens mantidas na DLQ: {e}")
+        self.held.clear()
+
+    def move(self, messages):
+        self.limiter.acquire(len(messages))
+        if self.dry_run:
+            for message in messages:
+                self.hold(message)
+            with self.lock:
+                self.counts["moved"] += len(messages)
+            return
+
+        entries = []
+        for message in messages:
+            entry = {"Id": message["MessageId"], "MessageBody": message["Body"]}
+            if message.get("MessageAttributes"):
+                entry["MessageAttributes"] = message["MessageAttributes"]
+            entries.append(entry)
+
+        try:
+            response = self.sqs.send_message_batch(QueueUrl=self.target_url, Entries=entries)
+        except (BotoCoreError, ClientError) as e:
+            print(f"❌ Falha ao reenviar mensagens: {e}")
+            for message in messages:
+                self.hold(message)
+            with self.lock:
+                self.claimed -= len(messages)
+                self.counts["failed"] += len(messages)
+            return
+
+        sent = {entry["Id"] for entry in response.get("Successful", [])}
+        for message in messages:
+            if message["MessageId"] not in sent:
+                self.hold(message)
+        to_delete = [
+            {"Id": message["MessageId"], "ReceiptHandle": message["ReceiptHandle"]}
+            for message in messages
+            if message["MessageId"] in sent
+        ]
+        if to_delete:
+            try:
+                self.sqs.delete_message_batch(QueueUrl=self.source_url, Entries=to_delete)
+            except (BotoCoreError, ClientError) as e:
+                print(f"⚠️  Mensagens reenviadas mas não removidas da DLQ: {e}")
+
+        with self.lock:
+            self.claimed -= len(messages) - len(sent)
+            self.counts["moved"] += len(sent)
+            self.counts["failed"] += len(messages) - len(sent)
+
+
+def queue_url(sqs, name_or_url):
+    if name_or_url.startswith("http"):
+        return name_or_url
+    return sqs.get_queue_url(QueueName=name_or_url)["QueueUrl"]
+
+
+def main():
+    load_dotenv()
+    queue_name = os.getenv("QUEUE_NAME", "enrollment-queue")
+
+    parser = argparse.ArgumentParser(description="Reenvia mensagens da DLQ para a fila de matrículas.")
+    parser.add_argument("--source", default=os.getenv("DLQ_NAME", f"{queue_name}-dlq"))
+    parser.add_argument("--target", default=queue_name)
+    parser.add_argument("--reason", action="append", choices=REASONS,
+                        help="Motivo de falha a reenviar (pode repetir; padrão: todos)")
+    parser.add_argument("--rate", type=float, default=100, help="Mensagens por segundo")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-messages", type=int)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--visibility-timeout", type=int, default=900,
+                        help="Segundos em que as mensagens não reenviadas ficam ocultas durante a execução")
+    parser.add_argument("--endpoint-url", default=os.getenv("AWS_ENDPOINT_URL"))
+    args = parser.parse_args()
+
+    sqs = boto3.client(
+        "sqs",
+        endpoint_url=args.endpoint_url,
+        region_name=os.getenv("AWS_DEFAULT_REGION"),
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
+        config=Config(max_pool_connections=args.concurrency * 2),
+    )
+    redrive = Redrive(
+        sqs,
+        queue_url(sqs, args.source),
+        queue_url(sqs, args.target),
+        args.reason or REASONS,
+        args.rate,
+        args.max_messages,
+        args.dry_run,
+        args.visibility_timeout,
+    )
+
+    print(f"🔹 Reenviando de '{args.source}' para '{args.target}'...")
+    started = time.monotonic()
+    threads = [threading.Thread(target=redrive.run_thread) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    redrive.release()
+    elapsed = time.monotonic() - started
+
+    moved = redrive.counts["moved"]
+    print(f"✅ {moved} reenviadas, {redrive.counts['skipped']} ignoradas, "
+          f"{redrive.counts['failed']} falharam em {elapsed:.1f}s ({moved / max(elapsed, 1e-9):.1f} msg/s)")
+    print(f"   Motivos encontrados: {json.dumps(redrive.by_reason)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,20 @@ else
     aws dynamodb wait table-exists --table-name "$AGE_GROUPS_TABLE" --endpoint-url="$AWS_ENDPOINT_URL"
 fi
 
+AGE_GROUPS_CONFIG_TABLE="${AGE_GROUPS_CONFIG_TABLE:-AgeGroupsConfig}"
+if aws dynamodb list-tables --endpoint-url="$AWS_ENDPOINT_URL" --output json | grep -q "\"$AGE_GROUPS_CONFIG_TABLE\""; then
+    echo "⚠️  Tabela '$AGE_GROUPS_CONFIG_TABLE' já existe."
+else
+    echo "🔹 Criando tabela DynamoDB: $AGE_GROUPS_CONFIG_TABLE..."
+    aws dynamodb create-table \
+        --table-name "$AGE_GROUPS_CONFIG_TABLE" \
+        --attribute-definitions AttributeName=id,AttributeType=S \
+        --key-schema AttributeName=id,KeyType=HASH \
+        --billing-mode PAY_PER_REQUEST \
+        --endpoint-url="$AWS_ENDPOINT_URL" || { echo "❌ Falha ao criar tabela $AGE_GROUPS_CONFIG_TABLE"; exit 1; }
+    aws dynamodb wait table-exists --table-name "$AGE_GROUPS_CONFIG_TABLE" --endpoint-url="$AWS_ENDPOINT_URL"
+fi
+
 if aws dynamodb list-tables --endpoint-url="$AWS_ENDPOINT_URL" --output json | grep -q "\"$ENROLLMENTS_TABLE\""; then
     echo "⚠️  Tabela '$ENROLLMENTS_TABLE' já existe."
 else
@@ -56,7 +70,39 @@ else
     aws dynamodb wait table-exists --table-name "$ENROLLMENTS_TABLE" --endpoint-url="$AWS_ENDPOINT_URL"
 fi
 
-if aws sqs list-queues --endpoint-url="$AWS_ENDPOINT_URL" --output json | grep -q "$QUEUE_NAME"; then
+if [ -n "$IDEMPOTENCY_TABLE" ]; then
+    if aws dynamodb list-tables --endpoint-url="$AWS_ENDPOINT_URL" --output json | grep -q "\"$IDEMPOTENCY_TABLE\""; then
+        echo "⚠️  Tabela '$IDEMPOTENCY_TABLE' já existe."
+    else
+        echo "🔹 Criando tabela DynamoDB: $IDEMPOTENCY_TABLE..."
+        aws dynamodb create-table \
+            --table-name "$IDEMPOTENCY_TABLE" \
+            --attribute-definitions AttributeName=idempotency_key,AttributeType=S \
+            --key-schema AttributeName=idempotency_key,KeyType=HASH \
+            --billing-mode PAY_PER_REQUEST \
+            --endpoint-url="$AWS_ENDPOINT_URL" || { echo "❌ Falha ao criar tabela $IDEMPOTENCY_TABLE"; exit 1; }
+        aws dynamodb wait table-exists --table-name "$IDEMPOTENCY_TABLE" --endpoint-url="$AWS_ENDPOINT_URL"
+        aws dynamodb update-time-to-live \
+            --table-name "$IDEMPOTENCY_TABLE" \
+            --time-to-live-specification "Enabled=true,AttributeName=expires_at" \
+            --endpoint-url="$AWS_ENDPOINT_URL" || { echo "❌ Falha ao configurar TTL em $IDEMPOTENCY_TABLE"; exit 1; }
+    fi
+fi
+
+DLQ_NAME="${DLQ_NAME:-$QUEUE_NAME-dlq}"
+DLQ_MAX_RECEIVE_COUNT="${DLQ_MAX_RECEIVE_COUNT:-5}"
+
+if aws sqs list-queues --endpoint-url="$AWS_ENDPOINT_URL" --output json | grep -q "/$DLQ_NAME\""; then
+    echo "⚠️  Fila '$DLQ_NAME' já existe."
+else
+    echo "🔹 Criando fila de mensagens mortas (DLQ)..."
+    aws sqs create-queue \
+        --queue-name "$DLQ_NAME" \
+        --attributes MessageRetentionPeriod=1209600 \
+        --endpoint-url="$AWS_ENDPOINT_URL" || { echo "❌ Falha ao criar fila $DLQ_NAME"; exit 1; }
+fi
+
+if aws sqs list-queues --endpoint-url="$AWS_ENDPOINT_URL" --output json | grep -q "/$QUEUE_NAME\""; then
     echo "⚠️  Fila '$QUEUE_NAME' já existe."
 else
     echo "🔹 Criando fila SQS..."
@@ -66,6 +112,24 @@ fi
 QUEUE_URL=$(aws sqs get-queue-url --queue-name "$QUEUE_NAME" --endpoint-url="$AWS_ENDPOINT_URL" --output text) || { echo "❌ Falha ao obter URL da fila"; exit 1; }
 echo $QUEUE_URL
 
+echo "🔹 Associando DLQ à fila (maxReceiveCount=$DLQ_MAX_RECEIVE_COUNT)..."
+DLQ_ARN="arn:aws:sqs:$AWS_DEFAULT_REGION:$AWS_ACCOUNT_ID:$DLQ_NAME"
+aws sqs set-queue-attributes \
+    --queue-url "$QUEUE_URL" \
+    --attributes "{\"RedrivePolicy\": \"{\\\"deadLetterTargetArn\\\":\\\"$DLQ_ARN\\\",\\\"maxReceiveCount\\\":\\\"$DLQ_MAX_RECEIVE_COUNT\\\"}\"}" \
+    --endpoint-url="$AWS_ENDPOINT_URL" || { echo "❌ Falha ao configurar DLQ"; exit 1; }
+
+if [ -n "$AGE_GROUP_EVENTS_QUEUE" ]; then
+    if aws sqs list-queues --endpoint-url="$AWS_ENDPOINT_URL" --output json | grep -q "/$AGE_GROUP_EVENTS_QUEUE\""; then
+        echo "⚠️  Fila '$AGE_GROUP_EVENTS_QUEUE' já existe."
+    else
+        echo "🔹 Criando fila de eventos de grupos de idade..."
+        aws sqs create-queue \
+            --queue-name "$AGE_GROUP_EVENTS_QUEUE" \
+            --endpoint-url="$AWS_ENDPOINT_URL" || { echo "❌ Falha ao criar fila $AGE_GROUP_EVENTS_QUEUE"; exit 1; }
+    fi
+fi
+
 echo "🔹 Criando pacote Lambda..."
 ZIP_FILE="/scripts/lambda_function.zip"
 [ -f "$ZIP_FILE" ] && rm -f "$ZIP_FILE"
@@ -89,7 +153,7 @@ else
         --zip-file "fileb://$ZIP_FILE" \
         --timeout 2 \
         --memory-size 256 \
-        --environment "Variables={AWS_ENDPOINT_URL=$AWS_ENDPOINT_URL,AWS_DEFAULT_REGION=$AWS_DEFAULT_REGION,SQS_ENROLLMENT_QUEUE_URL=$QUEUE_URL,DB_ENROLLMENTS_TABLE_NAME=$ENROLLMENTS_TABLE}" \
+        --environment "Variables={AWS_ENDPOINT_URL=$AWS_ENDPOINT_URL,AWS_DEFAULT_REGION=$AWS_DEFAULT_REGION,DB_ENROLLMENTS_TABLE_NAME=$ENROLLMENTS_TABLE}" \
         --endpoint-url="$AWS_ENDPOINT_URL" || { echo "❌ Falha ao criar Lambda"; exit 1; }
     sleep 2
 fi
@@ -121,6 +185,7 @@ else
         --function-name "$LAMBDA_NAME" \
         --event-source-arn "arn:aws:sqs:$AWS_DEFAULT_REGION:$AWS_ACCOUNT_ID:$QUEUE_NAME" \
         --batch-size 10 \
+        --function-response-types ReportBatchItemFailures \
         --endpoint-url="$AWS_ENDPOINT_URL" || { echo "❌ Falha ao associar SQS à Lambda"; exit 1; }
 fi
 
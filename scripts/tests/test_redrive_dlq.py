@@ -0,0 +1,129 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import redrive_dlq
+
+VALID_V1 = {
+    "id": "1",
+    "name": "Testando",
+    "cpf": "1",
+    "age": 20,
+    "status": "pending",
+    "age_group_id": "",
+}
+
+
+def make_message(message_id, body):
+    return {
+        "MessageId": message_id,
+        "ReceiptHandle": f"handle-{message_id}",
+        "Body": body if isinstance(body, str) else json.dumps(body),
+    }
+
+
+class FakeDLQ:
+    """Serves ``messages`` in batches of 10, then serves them once more as if they reappeared."""
+
+    def __init__(self, messages):
+        self.batches = [
+            messages[start : start + 10] for start in range(0, len(messages), 10)
+        ]
+        self.batches += self.batches[:1]
+        self.sqs = MagicMock()
+        self.sqs.receive_message.side_effect = lambda **kwargs: {
+            "Messages": self.batches.pop(0) if self.batches else []
+        }
+        self.sqs.send_message_batch.side_effect = lambda Entries, **kwargs: {
+            "Successful": [{"Id": entry["Id"]} for entry in Entries]
+        }
+
+    def released(self):
+        return [
+            entry["Id"]
+            for call in self.sqs.change_message_visibility_batch.call_args_list
+            for entry in call.kwargs["Entries"]
+        ]
+
+
+def make_redrive(sqs, max_messages=None, dry_run=False):
+    return redrive_dlq.Redrive(
+        sqs,
+        "source",
+        "target",
+        ["processing"],
+        1000,
+        max_messages,
+        dry_run,
+        visibility_timeout=900,
+    )
+
+
+@pytest.mark.parametrize(
+    ("body", "attributes", "expected"),
+    [
+        ("{not json", {}, "invalid_json"),
+        ('"x"', {}, "missing_fields"),
+        ({"id": "1"}, {}, "missing_fields"),
+        (VALID_V1, {}, "processing"),
+        (
+            {"i": "1", "n": "Testando", "c": "1", "a": 20, "s": "pending"},
+            {},
+            "missing_fields",
+        ),
+        (
+            {"i": "1", "n": "Testando", "c": "1", "a": 20, "s": "pending"},
+            {"schema_version": {"StringValue": "2"}},
+            "processing",
+        ),
+    ],
+)
+def test_classify(body, attributes, expected):
+    message = {**make_message("m1", body), "MessageAttributes": attributes}
+
+    assert redrive_dlq.classify(message) == expected
+
+
+def test_rate_limiter_lets_a_full_batch_through_below_ten_per_second():
+    limiter = redrive_dlq.RateLimiter(5)
+
+    with patch.object(redrive_dlq.time, "sleep") as sleep:
+        limiter.acquire(redrive_dlq.MAX_BATCH)
+
+    sleep.assert_not_called()
+    with pytest.raises(ValueError):
+        limiter.acquire(redrive_dlq.MAX_BATCH + 1)
+
+
+def test_dry_run_counts_each_message_once_and_releases_it():
+    messages = [
+        make_message(f"m{index}", VALID_V1 if index % 2 else "{") for index in range(25)
+    ]
+    dlq = FakeDLQ(messages)
+    redrive = make_redrive(dlq.sqs, dry_run=True)
+
+    redrive.run_thread()
+    redrive.release()
+
+    assert redrive.counts == {"moved": 12, "skipped": 13, "failed": 0}
+    assert sorted(dlq.released()) == sorted(
+        message["MessageId"] for message in messages
+    )
+    dlq.sqs.send_message_batch.assert_not_called()
+    dlq.sqs.delete_message_batch.assert_not_called()
+
+
+def test_max_messages_is_checked_before_moving():
+    max_messages = 3
+    messages = [make_message(f"m{index}", VALID_V1) for index in range(10)]
+    dlq = FakeDLQ(messages)
+    redrive = make_redrive(dlq.sqs, max_messages=max_messages)
+
+    redrive.run_thread()
+    redrive.release()
+
+    sent = dlq.sqs.send_message_batch.call_args.kwargs["Entries"]
+    assert len(sent) == redrive.counts["moved"] == max_messages
+    assert len(dlq.released()) == len(messages) - max_messages
+    dlq.sqs.receive_message.assert_called_once()